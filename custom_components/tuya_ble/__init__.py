@@ -8,26 +8,31 @@ from bleak_retry_connector import BLEAK_RETRY_EXCEPTIONS as BLEAK_EXCEPTIONS, ge
 from homeassistant.components import bluetooth
 from homeassistant.components.bluetooth.match import ADDRESS, BluetoothCallbackMatcher
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ADDRESS, EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.const import (
+    CONF_ADDRESS,
+    CONF_DEVICE_ID,
+    EVENT_HOMEASSISTANT_STOP,
+)
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from .tuya_ble import TuyaBLEDevice
+from .tuya_ble import TuyaBLEConnectPriority, TuyaBLEDevice
 
 from .cloud import HASSTuyaBLEDeviceManager
-from .const import DOMAIN
-from .devices import TuyaBLECoordinator, TuyaBLEData, get_device_product_info
-
-PLATFORMS: list[Platform] = [
-    Platform.BUTTON,
-    Platform.CLIMATE,
-    Platform.NUMBER,
-    Platform.SENSOR,
-    Platform.BINARY_SENSOR,
-    Platform.SELECT,
-    Platform.SWITCH,
-    Platform.TEXT,
-]
+from .const import (
+    CONF_CATEGORY,
+    CONF_LOCAL_KEY,
+    CONF_PRODUCT_ID,
+    DOMAIN,
+)
+from .devices import (
+    TuyaBLECoordinator,
+    TuyaBLEData,
+    async_build_mapping_index,
+    get_device_idle_disconnect_delay,
+    get_device_platforms,
+    get_device_product_info,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,8 +51,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     device = TuyaBLEDevice(manager, ble_device)
     await device.initialize()
     product_info = get_device_product_info(device)
+    device.idle_disconnect_delay = get_device_idle_disconnect_delay(device)
 
-    coordinator = TuyaBLECoordinator(hass, device)
+    coordinator = TuyaBLECoordinator(hass, device, product_info)
+    await async_build_mapping_index(hass)
+    platforms = get_device_platforms(device)
 
     '''
     try:
@@ -57,7 +65,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             f"Could not communicate with Tuya BLE device with address {address}"
         ) from ex
     '''
-    hass.add_job(device.update())
+    # Startup connections must not delay commands of the user.
+    hass.add_job(device.update(TuyaBLEConnectPriority.BACKGROUND))
 
     @callback
     def _async_update_ble(
@@ -84,9 +93,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         product_info,
         manager,
         coordinator,
+        platforms,
     )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     async def _async_stop(event: Event) -> None:
@@ -102,14 +112,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     data: TuyaBLEData = hass.data[DOMAIN][entry.entry_id]
-    if entry.title != data.title:
+    if entry.title != data.title or _credentials_changed(entry, data.device):
         await hass.config_entries.async_reload(entry.entry_id)
 
 
+def _credentials_changed(entry: ConfigEntry, device: TuyaBLEDevice) -> bool:
+    """Check if options hold other credentials than device was set up with."""
+    return any(
+        entry.options.get(key) not in (None, value)
+        for key, value in (
+            (CONF_LOCAL_KEY, device.local_key),
+            (CONF_DEVICE_ID, device.device_id),
+            (CONF_CATEGORY, device.category),
+            (CONF_PRODUCT_ID, device.product_id),
+        )
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        data: TuyaBLEData = hass.data[DOMAIN].pop(entry.entry_id)
+    data: TuyaBLEData = hass.data[DOMAIN][entry.entry_id]
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, data.platforms
+    ):
+        hass.data[DOMAIN].pop(entry.entry_id)
         await data.device.stop()
 
     return unload_ok
@@ -12,6 +12,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -20,7 +21,13 @@ from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from .const import (
     DOMAIN,
 )
-from .devices import TuyaBLEData, TuyaBLEEntity, TuyaBLEProductInfo
+from .devices import (
+    TuyaBLEData,
+    TuyaBLEEntity,
+    TuyaBLEProductInfo,
+    get_device_mappings,
+    get_entity_datapoint_ids,
+)
 from .tuya_ble import TuyaBLEDataPointType, TuyaBLEDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -70,17 +77,7 @@ mapping: dict[str, TuyaBLECategoryBinarySensorMapping] = {
 
 
 def get_mapping_by_device(device: TuyaBLEDevice) -> list[TuyaBLEBinarySensorMapping]:
-    category = mapping.get(device.category)
-    if category is not None and category.products is not None:
-        product_mapping = category.products.get(device.product_id)
-        if product_mapping is not None:
-            return product_mapping
-        if category.mapping is not None:
-            return category.mapping
-        else:
-            return []
-    else:
-        return []
+    return get_device_mappings(device).get(Platform.BINARY_SENSOR, [])
 
 
 class TuyaBLEBinarySensor(TuyaBLEEntity, BinarySensorEntity):
@@ -96,6 +93,11 @@ class TuyaBLEBinarySensor(TuyaBLEEntity, BinarySensorEntity):
     ) -> None:
         super().__init__(hass, coordinator, device, product, mapping.description)
         self._mapping = mapping
+        self._dp_ids = get_entity_datapoint_ids(
+            product,
+            mapping.dp_id,
+            mapping.getter is not None or mapping.is_available is not None,
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -129,7 +131,7 @@ class TuyaBLEBinarySensor(TuyaBLEEntity, BinarySensorEntity):
                 else:
                     self._attr_native_value = datapoint.value
                 '''
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
     @property
     def available(self) -> bool:
@@ -20,13 +20,18 @@ from homeassistant.components.climate.const import (
     PRESET_ECO,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
+from homeassistant.const import Platform, UnitOfTemperature
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import DOMAIN
-from .devices import TuyaBLEData, TuyaBLEEntity, TuyaBLEProductInfo
+from .devices import (
+    TuyaBLEData,
+    TuyaBLEEntity,
+    TuyaBLEProductInfo,
+    get_device_mappings,
+)
 from .tuya_ble import TuyaBLEDataPoint, TuyaBLEDataPointType, TuyaBLEDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -325,17 +330,7 @@ mapping: dict[str, TuyaBLECategoryClimateMapping] = {
 
 
 def get_mapping_by_device(device: TuyaBLEDevice) -> list[TuyaBLECategoryClimateMapping]:
-    category = mapping.get(device.category)
-    if category is not None and category.products is not None:
-        product_mapping = category.products.get(device.product_id)
-        if product_mapping is not None:
-            return product_mapping
-        if category.mapping is not None:
-            return category.mapping
-        else:
-            return []
-    else:
-        return []
+    return get_device_mappings(device).get(Platform.CLIMATE, [])
 
 
 class TuyaBLEClimate(TuyaBLEEntity, ClimateEntity):
@@ -351,6 +346,20 @@ class TuyaBLEClimate(TuyaBLEEntity, ClimateEntity):
     ) -> None:
         super().__init__(hass, coordinator, device, product, mapping.description)
         self._mapping = mapping
+        self._dp_ids = {
+            dp_id
+            for dp_id in (
+                mapping.hvac_mode_bool_dp_id,
+                mapping.hvac_mode_value_dp_id,
+                mapping.hvac_mode_enum_dp_id,
+                mapping.current_temperature_dp_id,
+                mapping.target_temperature_dp_id,
+                mapping.current_humidity_dp_id,
+                mapping.target_humidity_dp_id,
+                *(mapping.preset_mode_dp_ids or {}).values(),
+            )
+            if dp_id
+        }
         self._attr_hvac_mode = HVACMode.HEAT
         self._attr_preset_mode = PRESET_NONE
         self._attr_hvac_action = HVACAction.HEATING
@@ -503,7 +512,7 @@ class TuyaBLEClimate(TuyaBLEEntity, ClimateEntity):
         except Exception:
             self._attr_hvac_action = HVACAction.IDLE
 
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
     async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature."""
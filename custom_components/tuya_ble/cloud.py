@@ -1,10 +1,13 @@
 """The Tuya BLE integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from dataclasses import dataclass
+import hashlib
 import json
+import time
 from typing import Any, Iterable
 
 from homeassistant.const import (
@@ -23,6 +26,7 @@ from homeassistant.components.tuya.const import (
     TUYA_RESPONSE_SUCCESS,
 )
 from homeassistant.helpers.entity import DeviceInfo, EntityDescription
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
@@ -42,6 +46,10 @@ from .tuya_ble import (
 )
 
 from .const import (
+    CLOUD_CACHE_SAVE_DELAY,
+    CLOUD_CACHE_STORAGE_KEY,
+    CLOUD_CACHE_STORAGE_VERSION,
+    CLOUD_CACHE_TTL,
     CONF_PRODUCT_MODEL,
     CONF_UUID,
     CONF_LOCAL_KEY,
@@ -50,12 +58,12 @@ from .const import (
     CONF_DEVICE_NAME,
     CONF_PRODUCT_NAME,
     DOMAIN,
+    TUYA_API_CONCURRENCY,
     TUYA_API_DEVICES_URL,
     TUYA_API_FACTORY_INFO_URL,
+    TUYA_FACTORY_INFO_BATCH_SIZE,
     TUYA_FACTORY_INFO_MAC,
-    TUYA_API_DEVICES_URL,
-    TUYA_API_FACTORY_INFO_URL,
-    TUYA_FACTORY_INFO_MAC,
+    TUYA_TOKEN_REFRESH_MARGIN,
     CONF_ACCESS_ID,
     CONF_ACCESS_SECRET,
     CONF_AUTH_TYPE,
@@ -70,6 +78,11 @@ class TuyaCloudCacheItem:
     api: TuyaOpenAPI | None
     login: dict[str, Any]
     credentials: dict[str, dict[str, Any]]
+    updated: float = 0.0
+
+    @property
+    def expired(self) -> bool:
+        return time.time() - self.updated > CLOUD_CACHE_TTL
 
 
 CONF_TUYA_LOGIN_KEYS = [
@@ -95,6 +108,39 @@ CONF_TUYA_DEVICE_KEYS = [
 ]
 
 _cache: dict[str, TuyaCloudCacheItem] = {}
+_cache_store: Store | None = None
+_cache_load_lock = asyncio.Lock()
+_revalidating: set[str] = set()
+_updating: dict[str, asyncio.Task[dict[Any, Any]]] = {}
+# MAC address -> cache key -> device credentials.
+_credentials_index: dict[str, dict[str, dict[str, Any]]] = {}
+
+# Number of login and fill rounds saved by joining one already in flight.
+cloud_calls_saved: int = 0
+
+
+def _index_credentials(key: str, credentials: dict[str, dict[str, Any]]) -> None:
+    for address, device_credentials in credentials.items():
+        _credentials_index.setdefault(address, {})[key] = device_credentials
+
+
+def _unindex_credentials(key: str, credentials: dict[str, dict[str, Any]]) -> None:
+    for address in credentials.keys():
+        accounts = _credentials_index.get(address)
+        if accounts is not None:
+            accounts.pop(key, None)
+            if len(accounts) == 0:
+                del _credentials_index[address]
+
+
+def _find_credentials(address: str) -> tuple[str, dict[str, Any]] | None:
+    """Find cache key and credentials of the device by its address."""
+    accounts = _credentials_index.get(address)
+    if not accounts:
+        return None
+    # Device shared by several accounts always resolves to the same one.
+    key = min(accounts.keys())
+    return (key, accounts[key])
 
 
 class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
@@ -109,6 +155,15 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
     def _is_login_success(response: dict[Any, Any]) -> bool:
         return bool(response.get(TUYA_RESPONSE_SUCCESS, False))
 
+    @staticmethod
+    def _is_token_fresh(api: TuyaOpenAPI) -> bool:
+        """Check that access token is not going to expire soon."""
+        token_info = api.token_info
+        if token_info is None:
+            return False
+        margin = TUYA_TOKEN_REFRESH_MARGIN * 1000
+        return token_info.expire_time - margin > time.time() * 1000
+
     @staticmethod
     def _get_cache_key(data: dict[str, Any]) -> str:
         key_dict = {key: data.get(key) for key in CONF_TUYA_LOGIN_KEYS}
@@ -128,6 +183,115 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
                 return False
         return True
 
+    async def _load_cache(self) -> None:
+        """Load credentials saved on disk by previous runs."""
+        global _cache_store
+        async with _cache_load_lock:
+            if _cache_store is not None:
+                return
+            store: Store = Store(
+                self._hass,
+                CLOUD_CACHE_STORAGE_VERSION,
+                CLOUD_CACHE_STORAGE_KEY,
+                private=True,
+            )
+            stored = await store.async_load()
+            if stored:
+                # Logins are not stored, they are taken from config entries.
+                logins = {
+                    self._get_stored_key(key): (key, login)
+                    for key, login in self._get_config_entries_logins().items()
+                }
+                for stored_key, stored_item in stored.get("items", {}).items():
+                    if stored_key not in logins:
+                        continue
+                    key, login = logins[stored_key]
+                    if key not in _cache:
+                        item = TuyaCloudCacheItem(
+                            None,
+                            login,
+                            stored_item.get("credentials", {}),
+                            stored_item.get("updated", 0.0),
+                        )
+                        _cache[key] = item
+                        _index_credentials(key, item.credentials)
+                _LOGGER.debug("Loaded %s cached cloud accounts", len(_cache))
+            _cache_store = store
+
+    @staticmethod
+    def _get_stored_key(cache_key: str) -> str:
+        """Get key of the account on disk, it must not reveal the login."""
+        return hashlib.sha256(cache_key.encode()).hexdigest()
+
+    def _get_config_entries_logins(self) -> dict[str, dict[str, Any]]:
+        """Get logins of all Tuya and Tuya BLE config entries by cache key."""
+        logins: dict[str, dict[str, Any]] = {}
+        for config_entry in self._hass.config_entries.async_entries(TUYA_DOMAIN):
+            logins[self._get_cache_key(config_entry.data)] = dict(config_entry.data)
+        for config_entry in self._hass.config_entries.async_entries(DOMAIN):
+            logins[self._get_cache_key(config_entry.options)] = dict(
+                config_entry.options
+            )
+        return logins
+
+    def _cache_data_to_save(self) -> dict[str, Any]:
+        """Get cloud cache contents to be saved on disk."""
+        # Accounts no config entry refers to anymore are pruned.
+        keys = self._get_config_entries_logins().keys()
+        return {
+            "items": {
+                self._get_stored_key(key): {
+                    "credentials": item.credentials,
+                    "updated": item.updated,
+                }
+                for key, item in _cache.items()
+                if key in keys and len(item.credentials) > 0
+            }
+        }
+
+    def _save_cache(self) -> None:
+        if _cache_store is not None:
+            _cache_store.async_delay_save(
+                self._cache_data_to_save, CLOUD_CACHE_SAVE_DELAY
+            )
+
+    def invalidate_cache(self, data: dict[str, Any] | None = None) -> None:
+        """Drop cached credentials of the account."""
+        key = self._get_cache_key(self._data if data is None else data)
+        item = _cache.pop(key, None)
+        if item is not None:
+            _unindex_credentials(key, item.credentials)
+            self._save_cache()
+
+    def _schedule_revalidation(self, data: dict[str, Any]) -> None:
+        """Refresh cached credentials of the account in background."""
+        global cloud_calls_saved
+        key = self._get_cache_key(data)
+        if key in _revalidating:
+            cloud_calls_saved += 1
+            return
+        _revalidating.add(key)
+        self._hass.async_create_background_task(
+            self._revalidate(key, data.copy()),
+            "tuya_ble revalidate cloud cache",
+        )
+
+    async def _revalidate(self, key: str, data: dict[str, Any]) -> None:
+        try:
+            response = await self._update_cache_item(data)
+            if not self._is_login_success(response):
+                # The account does not accept stored login anymore.
+                _LOGGER.debug(
+                    "Cached login for %s is rejected: %s",
+                    data.get(CONF_USERNAME),
+                    response,
+                )
+                self.invalidate_cache(data)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Failed to refresh cloud cache", exc_info=True)
+        finally:
+            _revalidating.discard(key)
+
     async def _login(self, data: dict[str, Any], add_to_cache: bool) -> dict[Any, Any]:
         """Login into Tuya cloud using credentials from data dictionary."""
         global _cache
@@ -135,13 +299,18 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
         if len(data) == 0:
             return {}
 
-        api = TuyaOpenAPI(
-            endpoint=data.get(CONF_ENDPOINT, ""),
-            access_id=data.get(CONF_ACCESS_ID, ""),
-            access_secret=data.get(CONF_ACCESS_SECRET, ""),
-            auth_type=data.get(CONF_AUTH_TYPE, ""),
-        )
-        api.set_dev_channel("hass")
+        cache_item = _cache.get(self._get_cache_key(data))
+        if cache_item is not None and cache_item.api is not None:
+            # Keep HTTP session of the account with its open connections.
+            api = cache_item.api
+        else:
+            api = TuyaOpenAPI(
+                endpoint=data.get(CONF_ENDPOINT, ""),
+                access_id=data.get(CONF_ACCESS_ID, ""),
+                access_secret=data.get(CONF_ACCESS_SECRET, ""),
+                auth_type=data.get(CONF_AUTH_TYPE, ""),
+            )
+            api.set_dev_channel("hass")
 
         response = await self._hass.async_add_executor_job(
             api.connect,
@@ -174,6 +343,24 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
     async def login(self, add_to_cache: bool = False) -> dict[Any, Any]:
         return await self._login(self._data, add_to_cache)
 
+    async def _get_factory_infos(
+        self,
+        item: TuyaCloudCacheItem,
+        device_ids: list[str],
+        semaphore: asyncio.Semaphore,
+    ) -> list[dict[str, Any]] | None:
+        """Get factory info of several devices with a single request."""
+        async with semaphore:
+            response = await self._hass.async_add_executor_job(
+                item.api.get,
+                TUYA_API_FACTORY_INFO_URL % (",".join(device_ids)),
+            )
+        result = response.get(TUYA_RESPONSE_RESULT)
+        if response.get(TUYA_RESPONSE_SUCCESS) and isinstance(result, list):
+            return result
+        _LOGGER.debug("Failed to get factory info: %s", response)
+        return None
+
     async def _fill_cache_item(self, item: TuyaCloudCacheItem) -> None:
         devices_response = await self._hass.async_add_executor_job(
             item.api.get,
@@ -182,20 +369,37 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
         if devices_response.get(TUYA_RESPONSE_SUCCESS):
             devices = devices_response.get(TUYA_RESPONSE_RESULT)
             if isinstance(devices, Iterable):
-                for device in devices:
-                    fi_response = await self._hass.async_add_executor_job(
-                        item.api.get,
-                        TUYA_API_FACTORY_INFO_URL % (device.get("id")),
+                credentials: dict[str, dict[str, Any]] = {}
+                devices_by_id = {
+                    device.get("id"): device for device in devices if device.get("id")
+                }
+                device_ids = list(devices_by_id.keys())
+                device_ids_batches = [
+                    device_ids[i : i + TUYA_FACTORY_INFO_BATCH_SIZE]
+                    for i in range(0, len(device_ids), TUYA_FACTORY_INFO_BATCH_SIZE)
+                ]
+                semaphore = asyncio.Semaphore(TUYA_API_CONCURRENCY)
+                batches = await asyncio.gather(
+                    *(
+                        self._get_factory_infos(item, batch_device_ids, semaphore)
+                        for batch_device_ids in device_ids_batches
                     )
-                    fi_response_result = fi_response.get(TUYA_RESPONSE_RESULT)
-                    if fi_response_result and len(fi_response_result) > 0:
-                        factory_info = fi_response_result[0]
-                        if factory_info and (TUYA_FACTORY_INFO_MAC in factory_info):
+                )
+                failed_device_ids: set[str] = set()
+                for batch_device_ids, factory_infos in zip(
+                    device_ids_batches, batches
+                ):
+                    if factory_infos is None:
+                        failed_device_ids.update(batch_device_ids)
+                        continue
+                    for factory_info in factory_infos:
+                        device = devices_by_id.get(factory_info.get("id"))
+                        if device and (TUYA_FACTORY_INFO_MAC in factory_info):
                             mac = ":".join(
                                 factory_info[TUYA_FACTORY_INFO_MAC][i : i + 2]
                                 for i in range(0, 12, 2)
                             ).upper()
-                            item.credentials[mac] = {
+                            credentials[mac] = {
                                 CONF_ADDRESS: mac,
                                 CONF_UUID: device.get("uuid"),
                                 CONF_LOCAL_KEY: device.get("local_key"),
@@ -206,39 +410,87 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
                                 CONF_PRODUCT_MODEL: device.get("model"),
                                 CONF_PRODUCT_NAME: device.get("product_name"),
                             }
+                # Devices of failed requests keep credentials known before.
+                for mac, device_credentials in item.credentials.items():
+                    if (
+                        mac not in credentials
+                        and device_credentials.get(CONF_DEVICE_ID) in failed_device_ids
+                    ):
+                        credentials[mac] = device_credentials
+                key = self._get_cache_key(item.login)
+                _unindex_credentials(key, item.credentials)
+                _index_credentials(key, credentials)
+                item.credentials = credentials
+                if not failed_device_ids:
+                    # Otherwise the cache stays expired and is refreshed again.
+                    item.updated = time.time()
+                self._save_cache()
+
+    async def _update_cache_item(self, data: dict[str, Any]) -> dict[Any, Any]:
+        """Login and fill cache item, concurrent callers share one request."""
+        global cloud_calls_saved
+        key = self._get_cache_key(data)
+        task = _updating.get(key)
+        if task is None:
+            task = self._hass.async_create_task(
+                self._do_update_cache_item(key, data.copy())
+            )
+            _updating[key] = task
+
+            def _done(_: asyncio.Task[dict[Any, Any]]) -> None:
+                if _updating.get(key) is task:
+                    del _updating[key]
+
+            task.add_done_callback(_done)
+        else:
+            cloud_calls_saved += 1
+            _LOGGER.debug(
+                "Joined cloud request in flight for %s, %s saved so far",
+                data.get(CONF_USERNAME),
+                cloud_calls_saved,
+            )
+        # Cancelling one of the callers must not cancel the others.
+        return await asyncio.shield(task)
+
+    async def _do_update_cache_item(
+        self, key: str, data: dict[str, Any]
+    ) -> dict[Any, Any]:
+        item = _cache.get(key)
+        if item is not None and item.api is not None and self._is_token_fresh(item.api):
+            # Logged in already, the token is refreshed by the API on demand.
+            await self._fill_cache_item(item)
+            return {TUYA_RESPONSE_SUCCESS: True}
+        response = await self._login(data, True)
+        if self._is_login_success(response):
+            item = _cache.get(key)
+            if item:
+                await self._fill_cache_item(item)
+        return response
+
+    async def _build_cache_item(self, data: dict[str, Any]) -> None:
+        item = _cache.get(self._get_cache_key(data))
+        if item is None or len(item.credentials) == 0:
+            await self._update_cache_item(data)
+        elif item.expired:
+            self._schedule_revalidation(item.login)
 
     async def build_cache(self) -> None:
-        global _cache
-        data = {}
+        await self._load_cache()
+
         tuya_config_entries = self._hass.config_entries.async_entries(TUYA_DOMAIN)
         for config_entry in tuya_config_entries:
-            data.clear()
-            data.update(config_entry.data)
-            key = self._get_cache_key(data)
-            item = _cache.get(key)
-            if item is None or len(item.credentials) == 0:
-                if self._is_login_success(await self._login(data, True)):
-                    item = _cache.get(key)
-                    if item and len(item.credentials) == 0:
-                        await self._fill_cache_item(item)
+            await self._build_cache_item(dict(config_entry.data))
 
         ble_config_entries = self._hass.config_entries.async_entries(DOMAIN)
         for config_entry in ble_config_entries:
-            data.clear()
-            data.update(config_entry.options)
-            key = self._get_cache_key(data)
-            item = _cache.get(key)
-            if item is None or len(item.credentials) == 0:
-                if self._is_login_success(await self._login(data, True)):
-                    item = _cache.get(key)
-                    if item and len(item.credentials) == 0:
-                        await self._fill_cache_item(item)
+            await self._build_cache_item(dict(config_entry.options))
+
+        self._save_cache()
 
     def get_login_from_cache(self) -> None:
         global _cache
-        for cache_item in _cache.values():
-            self._data.update(cache_item.login)
-            break
+        if len(_cache) > 0:
+            self._data.update(_cache[min(_cache.keys())].login)
 
     async def get_device_credentials(
         self,
@@ -255,21 +507,24 @@ class HASSTuyaBLEDeviceManager(AbstaractTuyaBLEDeviceManager):
         if not force_update and self._has_credentials(self._data):
             credentials = self._data.copy()
         else:
+            await self._load_cache()
             cache_key: str | None = None
             if self._has_login(self._data):
                 cache_key = self._get_cache_key(self._data)
             else:
-                for key in _cache.keys():
-                    if _cache[key].credentials.get(address) is not None:
-                        cache_key = key
-                        break
+                found = _find_credentials(address)
+                if found is not None:
+                    cache_key = found[0]
             if cache_key:
                 item = _cache.get(cache_key)
             if item is None or force_update:
-                if self._is_login_success(await self.login(True)):
+                # Forced update must return what the cloud has right now,
+                # e.g. changed local key after re-login in options flow.
+                if self._is_login_success(await self._update_cache_item(self._data)):
                     item = _cache.get(cache_key)
-                    if item:
-                        await self._fill_cache_item(item)
+            elif item.expired:
+                # Answer from cache at once, refresh it in background.
+                self._schedule_revalidation(item.login)
 
             if item:
                 credentials = item.credentials.get(address)
@@ -3,15 +3,28 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from enum import StrEnum
+from homeassistant.const import Platform
 from tuya_iot import TuyaCloudOpenAPIEndpoint
 from typing_extensions import Final
 
 DOMAIN: Final = "tuya_ble"
 
+PLATFORMS: list[Platform] = [
+    Platform.BUTTON,
+    Platform.CLIMATE,
+    Platform.NUMBER,
+    Platform.SENSOR,
+    Platform.BINARY_SENSOR,
+    Platform.SELECT,
+    Platform.SWITCH,
+    Platform.TEXT,
+]
+
 DEVICE_METADATA_UUIDS: Final = "uuids"
 
 DEVICE_DEF_MANUFACTURER: Final = "Tuya"
 SET_DISCONNECTED_DELAY = 10 * 60
+FINGERBOT_IDLE_DISCONNECT_DELAY = 60
 
 CONF_UUID: Final = "uuid"
 CONF_LOCAL_KEY: Final = "local_key"
@@ -32,6 +45,14 @@ TUYA_SMART_APP = "tuyaSmart"
 TUYA_API_DEVICES_URL: Final = "/v1.0/users/%s/devices"
 TUYA_API_FACTORY_INFO_URL: Final = "/v1.0/iot-03/devices/factory-infos?device_ids=%s"
 TUYA_FACTORY_INFO_MAC: Final = "mac"
+TUYA_FACTORY_INFO_BATCH_SIZE: Final = 20
+TUYA_API_CONCURRENCY: Final = 4
+TUYA_TOKEN_REFRESH_MARGIN: Final = 5 * 60
+
+CLOUD_CACHE_STORAGE_KEY: Final = "tuya_ble.cloud_cache"
+CLOUD_CACHE_STORAGE_VERSION: Final = 1
+CLOUD_CACHE_SAVE_DELAY: Final = 10
+CLOUD_CACHE_TTL: Final = 24 * 60 * 60
 
 BATTERY_STATE_LOW: Final = "low"
 BATTERY_STATE_NORMAL: Final = "normal"
@@ -1,9 +1,12 @@
 """The Tuya BLE integration."""
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from functools import lru_cache
+import importlib
 import logging
-from homeassistant.const import CONF_ADDRESS, CONF_DEVICE_ID
+from typing import Any, Callable
+from homeassistant.const import CONF_ADDRESS, CONF_DEVICE_ID, Platform
 
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
@@ -31,6 +34,8 @@ from .const import (
     DEVICE_DEF_MANUFACTURER,
     DOMAIN,
     FINGERBOT_BUTTON_EVENT,
+    FINGERBOT_IDLE_DISCONNECT_DELAY,
+    PLATFORMS,
     SET_DISCONNECTED_DELAY,
 )
 
@@ -76,27 +81,64 @@ class TuyaBLEEntity(CoordinatorEntity):
             self._attr_translation_key = description.key
         self.entity_description = description
         self._attr_has_entity_name = True
-        self._attr_device_info = get_device_info(self._device)
+        self._attr_device_info = coordinator.device_info
         self._attr_unique_id = f"{self._device.device_id}-{description.key}"
         self.entity_id = generate_entity_id(
             "sensor.{}", self._attr_unique_id, hass=hass
         )
+        # Datapoints the entity state depends on, None stands for all
+        self._dp_ids: set[int] | None = None
+        self._written_state: tuple[Any, ...] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to updates of datapoints used by the entity."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.async_add_datapoint_listener(
+                self._dp_ids, self._handle_coordinator_update
+            )
+        )
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return self._coordinator.connected
 
+    def _get_written_state(self) -> tuple[Any, ...]:
+        """Get values which end up in the state machine."""
+        if not self.available:
+            return (False,)
+        return (
+            True,
+            self.state,
+            self.icon,
+            self.state_attributes,
+            self.extra_state_attributes,
+        )
+
+    @callback
+    def _async_write_ha_state_if_changed(self) -> None:
+        """Write the state only if it differs from the last written one."""
+        state = self._get_written_state()
+        if state != self._written_state:
+            self._written_state = state
+            self.async_write_ha_state()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
 
 
 class TuyaBLECoordinator(DataUpdateCoordinator[None]):
     """Data coordinator for receiving Tuya BLE updates."""
 
-    def __init__(self, hass: HomeAssistant, device: TuyaBLEDevice) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device: TuyaBLEDevice,
+        product: TuyaBLEProductInfo | None = None,
+    ) -> None:
         """Initialise the coordinator."""
         super().__init__(
             hass,
@@ -104,8 +146,13 @@ class TuyaBLECoordinator(DataUpdateCoordinator[None]):
             name=DOMAIN,
         )
         self._device = device
+        self._device_info = get_device_info(device)
+        self._fingerbot_button_dp_id: int | None = None
+        if product and product.fingerbot and product.fingerbot.manual_control != 0:
+            self._fingerbot_button_dp_id = product.fingerbot.switch
         self._disconnected: bool = True
         self._unsub_disconnect: CALLBACK_TYPE | None = None
+        self._datapoint_listeners: dict[int | None, list[CALLBACK_TYPE]] = {}
         device.register_connected_callback(self._async_handle_connect)
         device.register_callback(self._async_handle_update)
         device.register_disconnected_callback(self._async_handle_disconnect)
@@ -114,6 +161,10 @@ class TuyaBLECoordinator(DataUpdateCoordinator[None]):
     def connected(self) -> bool:
         return not self._disconnected
 
+    @property
+    def device_info(self) -> DeviceInfo | None:
+        return self._device_info
+
     @callback
     def _async_handle_connect(self) -> None:
         if self._unsub_disconnect is not None:
@@ -122,15 +173,45 @@ class TuyaBLECoordinator(DataUpdateCoordinator[None]):
             self._disconnected = False
             self.async_update_listeners()
 
+    @callback
+    def async_add_datapoint_listener(
+        self, dp_ids: set[int] | None, update_callback: CALLBACK_TYPE
+    ) -> Callable[[], None]:
+        """Listen for updates of datapoints, None stands for all datapoints."""
+        keys: list[int | None] = list(dp_ids) if dp_ids is not None else [None]
+        for key in keys:
+            self._datapoint_listeners.setdefault(key, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            for key in keys:
+                listeners = self._datapoint_listeners[key]
+                listeners.remove(update_callback)
+                if not listeners:
+                    del self._datapoint_listeners[key]
+
+        return remove_listener
+
+    @callback
+    def _async_update_datapoint_listeners(self, dp_ids: set[int]) -> None:
+        """Notify listeners of the updated datapoints."""
+        listeners = dict.fromkeys(self._datapoint_listeners.get(None, []))
+        for dp_id in dp_ids:
+            listeners.update(dict.fromkeys(self._datapoint_listeners.get(dp_id, [])))
+        for update_callback in listeners:
+            update_callback()
+
     @callback
     def _async_handle_update(self, updates: list[TuyaBLEDataPoint]) -> None:
-        """Just trigger the callbacks."""
+        """Trigger the callbacks of entities using updated datapoints."""
         self._async_handle_connect()
-        self.async_set_updated_data(None)
-        info = get_device_product_info(self._device)
-        if info and info.fingerbot and info.fingerbot.manual_control != 0:
+        self._async_update_datapoint_listeners({update.id for update in updates})
+        if self._fingerbot_button_dp_id is not None:
             for update in updates:
-                if update.id == info.fingerbot.switch and update.changed_by_device:
+                if (
+                    update.id == self._fingerbot_button_dp_id
+                    and update.changed_by_device
+                ):
                     self.hass.bus.fire(
                         FINGERBOT_BUTTON_EVENT,
                         {
@@ -165,12 +246,15 @@ class TuyaBLEData:
     product: TuyaBLEProductInfo
     manager: HASSTuyaBLEDeviceManager
     coordinator: TuyaBLECoordinator
+    platforms: list[Platform] = field(default_factory=list)
 
 
 @dataclass
 class TuyaBLECategoryInfo:
     products: dict[str, TuyaBLEProductInfo]
     info: TuyaBLEProductInfo | None = None
+    # Seconds without traffic before disconnecting, None keeps connection
+    idle_disconnect_delay: float | None = None
 
 
 devices_database: dict[str, TuyaBLECategoryInfo] = {
@@ -263,6 +347,9 @@ devices_database: dict[str, TuyaBLECategoryInfo] = {
                 ),
             ),
         },
+        # Fingerbots without touch button only execute commands,
+        # release adapter slot between them.
+        idle_disconnect_delay=FINGERBOT_IDLE_DISCONNECT_DELAY,
     ),
     "wk": TuyaBLECategoryInfo(
         products={
@@ -337,6 +424,134 @@ def get_device_product_info(device: TuyaBLEDevice) -> TuyaBLEProductInfo | None:
     return get_product_info_by_ids(device.category, device.product_id)
 
 
+def get_device_idle_disconnect_delay(device: TuyaBLEDevice) -> float | None:
+    product_info = get_device_product_info(device)
+    if (
+        product_info is not None
+        and product_info.fingerbot is not None
+        and product_info.fingerbot.manual_control != 0
+    ):
+        # Touch button presses are pushed only over a live connection.
+        return None
+    category_info = devices_database.get(device.category)
+    if category_info is not None:
+        return category_info.idle_disconnect_delay
+    else:
+        return None
+
+
+def get_fingerbot_datapoint_ids(fingerbot: TuyaBLEFingerbotInfo) -> set[int]:
+    return {
+        dp_id
+        for dp_id in (
+            fingerbot.switch,
+            fingerbot.mode,
+            fingerbot.up_position,
+            fingerbot.down_position,
+            fingerbot.hold_time,
+            fingerbot.reverse_positions,
+            fingerbot.manual_control,
+            fingerbot.program,
+        )
+        if dp_id
+    }
+
+
+def get_entity_datapoint_ids(
+    product: TuyaBLEProductInfo | None,
+    dp_id: int,
+    uses_other_datapoints: bool = False,
+) -> set[int] | None:
+    """Get datapoints entity state depends on, None stands for all."""
+    if dp_id < 0:
+        return None
+    result = {dp_id}
+    if uses_other_datapoints:
+        # Custom getters and availability checks may read any datapoint,
+        # only the fingerbot ones are known in advance.
+        if product is None or product.fingerbot is None:
+            return None
+        result |= get_fingerbot_datapoint_ids(product.fingerbot)
+    return result
+
+
+_mapping_index: dict[tuple[str, str | None], dict[Platform, list[Any]]] | None = None
+
+
+def _compile_mapping_index() -> dict[
+    tuple[str, str | None], dict[Platform, list[Any]]
+]:
+    """Compile entity mappings of all platforms by category and product."""
+    index: dict[tuple[str, str | None], dict[Platform, list[Any]]] = {}
+    for platform in PLATFORMS:
+        module = importlib.import_module(f".{platform.value}", __package__)
+        for category, category_mapping in module.mapping.items():
+            if category_mapping.products is None:
+                continue
+            if category_mapping.mapping is not None:
+                index.setdefault((category, None), {})[
+                    platform
+                ] = category_mapping.mapping
+            for product_id, product_mapping in category_mapping.products.items():
+                index.setdefault((category, product_id), {})[
+                    platform
+                ] = product_mapping
+
+    # Platforms without product specific mapping use the category one.
+    for (category, product_id), platforms in index.items():
+        if product_id is not None:
+            defaults = index.get((category, None))
+            if defaults is not None:
+                for platform, platform_mapping in defaults.items():
+                    platforms.setdefault(platform, platform_mapping)
+
+    return index
+
+
+def get_mapping_index() -> dict[tuple[str, str | None], dict[Platform, list[Any]]]:
+    global _mapping_index
+    if _mapping_index is None:
+        _mapping_index = _compile_mapping_index()
+    return _mapping_index
+
+
+async def async_build_mapping_index(hass: HomeAssistant) -> None:
+    """Build mapping index outside of event loop, platforms get imported."""
+    if _mapping_index is None:
+        await hass.async_add_executor_job(get_mapping_index)
+
+
+def get_mappings_by_ids(category: str, product_id: str) -> dict[Platform, list[Any]]:
+    index = _mapping_index
+    if index is None:
+        index = get_mapping_index()
+    result = index.get((category, product_id))
+    if result is None:
+        result = index.get((category, None), {})
+    return result
+
+
+def get_device_mappings(device: TuyaBLEDevice) -> dict[Platform, list[Any]]:
+    return get_mappings_by_ids(device.category, device.product_id)
+
+
+@lru_cache(maxsize=None)
+def get_platforms_by_ids(category: str, product_id: str) -> tuple[Platform, ...]:
+    """Get platforms having entities for the product."""
+    mappings = get_mappings_by_ids(category, product_id)
+    return tuple(
+        platform
+        for platform in PLATFORMS
+        # Signal strength sensor is added for every device.
+        if platform == Platform.SENSOR or mappings.get(platform)
+    )
+
+
+def get_device_platforms(device: TuyaBLEDevice) -> list[Platform]:
+    """Get platforms having entities for the device."""
+    return list(get_platforms_by_ids(device.category, device.product_id))
+
+
 def get_short_address(address: str) -> str:
     results = address.replace("-", ":").upper().split(":")
     return f"{results[-3]}{results[-2]}{results[-1]}"[-6:]
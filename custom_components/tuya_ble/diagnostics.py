@@ -0,0 +1,60 @@
+"""Diagnostics support for the Tuya BLE integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import cloud
+from .const import (
+    CONF_ACCESS_ID,
+    CONF_ACCESS_SECRET,
+    CONF_LOCAL_KEY,
+    CONF_UUID,
+    DOMAIN,
+)
+from .devices import TuyaBLEData
+from .tuya_ble import get_advertisement_cache_info, global_connect_scheduler
+
+TO_REDACT = {
+    CONF_ACCESS_ID,
+    CONF_ACCESS_SECRET,
+    CONF_LOCAL_KEY,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    CONF_UUID,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: TuyaBLEData = hass.data[DOMAIN][entry.entry_id]
+    device = data.device
+    hits, misses, maxsize, currsize = get_advertisement_cache_info()
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "device": {
+            CONF_ADDRESS: device.address,
+            "rssi": device.rssi,
+            "category": device.category,
+            "product_id": device.product_id,
+            "protocol_version": device.protocol_version,
+            "idle_disconnect_delay": device.idle_disconnect_delay,
+        },
+        "connect_scheduler": global_connect_scheduler.as_dict(),
+        "advertisement_cache": {
+            "hits": hits,
+            "misses": misses,
+            "maxsize": maxsize,
+            "currsize": currsize,
+        },
+        "cloud_calls_saved": cloud.cloud_calls_saved,
+    }
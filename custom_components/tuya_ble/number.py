@@ -18,6 +18,7 @@ from homeassistant.const import (
     UnitOfTime,
     UnitOfVolume,
     UnitOfTemperature,
+    Platform,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
@@ -26,7 +27,13 @@ from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import DOMAIN
-from .devices import TuyaBLEData, TuyaBLEEntity, TuyaBLEProductInfo
+from .devices import (
+    TuyaBLEData,
+    TuyaBLEEntity,
+    TuyaBLEProductInfo,
+    get_device_mappings,
+    get_entity_datapoint_ids,
+)
 from .tuya_ble import TuyaBLEDataPointType, TuyaBLEDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -504,17 +511,7 @@ mapping: dict[str, TuyaBLECategoryNumberMapping] = {
 
 
 def get_mapping_by_device(device: TuyaBLEDevice) -> list[TuyaBLECategoryNumberMapping]:
-    category = mapping.get(device.category)
-    if category is not None and category.products is not None:
-        product_mapping = category.products.get(device.product_id)
-        if product_mapping is not None:
-            return product_mapping
-        if category.mapping is not None:
-            return category.mapping
-        else:
-            return []
-    else:
-        return []
+    return get_device_mappings(device).get(Platform.NUMBER, [])
 
 
 class TuyaBLENumber(TuyaBLEEntity, NumberEntity):
@@ -530,6 +527,11 @@ class TuyaBLENumber(TuyaBLEEntity, NumberEntity):
     ) -> None:
         super().__init__(hass, coordinator, device, product, mapping.description)
         self._mapping = mapping
+        self._dp_ids = get_entity_datapoint_ids(
+            product,
+            mapping.dp_id,
+            mapping.getter is not None or mapping.is_available is not None,
+        )
         self._attr_mode = mapping.mode
 
     @property
@@ -10,7 +10,7 @@ from homeassistant.components.select import (
     SelectEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
+from homeassistant.const import Platform, UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -30,7 +30,13 @@ from .const import (
     SCREEN_ORIENTATION_ALL,
     SCREEN_ORIENTATION_VALUE_MAP,
 )
-from .devices import TuyaBLEData, TuyaBLEEntity, TuyaBLEProductInfo
+from .devices import (
+    TuyaBLEData,
+    TuyaBLEEntity,
+    TuyaBLEProductInfo,
+    get_device_mappings,
+    get_entity_datapoint_ids,
+)
 from .tuya_ble import TuyaBLEDataPointType, TuyaBLEDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -247,17 +253,7 @@ mapping: dict[str, TuyaBLECategorySelectMapping] = {
 def get_mapping_by_device(
     device: TuyaBLEDevice
 ) -> list[TuyaBLECategorySelectMapping]:
-    category = mapping.get(device.category)
-    if category is not None and category.products is not None:
-        product_mapping = category.products.get(device.product_id)
-        if product_mapping is not None:
-            return product_mapping
-        if category.mapping is not None:
-            return category.mapping
-        else:
-            return []
-    else:
-        return []
+    return get_device_mappings(device).get(Platform.SELECT, [])
 
 
 class TuyaBLESelect(TuyaBLEEntity, SelectEntity):
@@ -279,6 +275,7 @@ class TuyaBLESelect(TuyaBLEEntity, SelectEntity):
             mapping.description
         )
         self._mapping = mapping
+        self._dp_ids = get_entity_datapoint_ids(product, mapping.dp_id)
         self._attr_options = mapping.description.options
 
     @property
@@ -16,7 +16,8 @@ from homeassistant.const import (
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
     UnitOfVolume,
     UnitOfTemperature,
-    UnitOfTime
+    UnitOfTime,
+    Platform,
 )
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
@@ -40,7 +41,13 @@ from .const import (
     MOTOR_THRUST_MIDDLE,
     MOTOR_THRUST_WEAK,
 )
-from .devices import TuyaBLEData, TuyaBLEEntity, TuyaBLEProductInfo
+from .devices import (
+    TuyaBLEData,
+    TuyaBLEEntity,
+    TuyaBLEProductInfo,
+    get_device_mappings,
+    get_entity_datapoint_ids,
+)
 from .tuya_ble import TuyaBLEDataPointType, TuyaBLEDevice
 
 from homeassistant.components.select import SelectEntity
@@ -556,17 +563,7 @@ rssi_mapping = TuyaBLESensorMapping(
     getter=rssi_getter,
 )
 def get_mapping_by_device(device: TuyaBLEDevice) -> list[TuyaBLESensorMapping]:
-    category = mapping.get(device.category)
-    if category is not None and category.products is not None:
-        product_mapping = category.products.get(device.product_id)
-        if product_mapping is not None:
-            return product_mapping
-        if category.mapping is not None:
-            return category.mapping
-        else:
-            return []
-    else:
-        return []
+    return get_device_mappings(device).get(Platform.SENSOR, [])
 class TuyaBLESensor(TuyaBLEEntity, SensorEntity):
     """Representation of a Tuya BLE sensor."""
     def __init__(
@@ -579,6 +576,11 @@ class TuyaBLESensor(TuyaBLEEntity, SensorEntity):
     ) -> None:
         super().__init__(hass, coordinator, device, product, mapping.description)
         self._mapping = mapping
+        self._dp_ids = get_entity_datapoint_ids(
+            product,
+            mapping.dp_id,
+            mapping.getter is not None or mapping.is_available is not None,
+        )
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
@@ -608,7 +610,7 @@ class TuyaBLESensor(TuyaBLEEntity, SensorEntity):
                     )
                 else:
                     self._attr_native_value = datapoint.value
-        self.async_write_ha_state()
+        self._async_write_ha_state_if_changed()
     @property
     def available(self) -> bool:
         """Return if entity is available."""
@@ -5,19 +5,30 @@ __version__ = "0.1.0"
 
 from .const import (
     SERVICE_UUID,
+    TuyaBLEConnectPriority,
     TuyaBLEDataPointType, 
 )
 from .manager import (
     AbstaractTuyaBLEDeviceManager,
     TuyaBLEDeviceCredentials,
 )
-from .tuya_ble import TuyaBLEDataPoint, TuyaBLEDevice 
+from .scheduler import get_ble_device_source
+from .tuya_ble import (
+    TuyaBLEDataPoint,
+    TuyaBLEDevice,
+    get_advertisement_cache_info,
+    global_connect_scheduler,
+)
 
 __all__ = [
     "AbstaractTuyaBLEDeviceManager",
+    "TuyaBLEConnectPriority",
     "TuyaBLEDataPoint",
     "TuyaBLEDataPointType",
     "TuyaBLEDevice",
     "TuyaBLEDeviceCredentials",
     "SERVICE_UUID",
+    "get_advertisement_cache_info",
+    "get_ble_device_source",
+    "global_connect_scheduler",
 ]
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from enum import Enum
+from enum import Enum, IntEnum
 
 GATT_MTU = 20
+ATT_HEADER_SIZE = 3
+GATT_WRITE_WINDOW = 4
+# Largest frame a device may announce, a v4 datapoint holds up to 64 KiB.
+INPUT_FRAME_MAX_LENGTH = 0x10000 + 0x100
 
 DEFAULT_ATTEMPTS = 0xFFFF
 
@@ -12,8 +16,19 @@ CHARACTERISTIC_WRITE = "00002b11-0000-1000-8000-00805f9b34fb"
 SERVICE_UUID = "0000a201-0000-1000-8000-00805f9b34fb"
 
 MANUFACTURER_DATA_ID = 0x07D0
+ADVERTISEMENT_CACHE_SIZE = 256
+
+CONNECT_SLOTS_PER_ADAPTER = 1
+DEFAULT_ADAPTER_SOURCE = "default"
+
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 5 * 60
+RECONNECT_FAILURE_THRESHOLD = 5
 
 RESPONSE_WAIT_TIMEOUT = 60
+DATAPOINTS_COALESCE_DELAY = 0.01
+HANDSHAKE_MIN_TIMEOUT = 15
+HANDSHAKE_TIMEOUT_FACTOR = 4
 
 
 class TuyaBLECode(Enum):
@@ -52,3 +67,8 @@ class TuyaBLEDataPointType(Enum):
     DT_STRING = 3
     DT_ENUM = 4
     DT_BITMAP = 5
+
+
+class TuyaBLEConnectPriority(IntEnum):
+    USER = 0
+    BACKGROUND = 1
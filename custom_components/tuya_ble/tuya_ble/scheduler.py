@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from bleak.backends.device import BLEDevice
+
+from .const import (
+    CONNECT_SLOTS_PER_ADAPTER,
+    DEFAULT_ADAPTER_SOURCE,
+    RECONNECT_BASE_DELAY,
+    RECONNECT_FAILURE_THRESHOLD,
+    RECONNECT_MAX_DELAY,
+    TuyaBLEConnectPriority,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_ble_device_source(ble_device: BLEDevice) -> str:
+    """Get the Bluetooth adapter or proxy the device is reachable through."""
+    details = ble_device.details
+    if isinstance(details, dict):
+        source = details.get("source")
+        if source:
+            return str(source)
+        props = details.get("props")
+        if isinstance(props, dict) and props.get("Adapter"):
+            return str(props["Adapter"])
+    return DEFAULT_ADAPTER_SOURCE
+
+
+class TuyaBLEConnectScheduler:
+    """Schedules connection attempts with separate slots for every adapter."""
+
+    def __init__(self, slots_per_adapter: int = CONNECT_SLOTS_PER_ADAPTER) -> None:
+        self._slots_per_adapter = slots_per_adapter
+        self._adapter_slots: dict[str, int] = {}
+        self._active: dict[str, int] = {}
+        self._waiters: dict[
+            str, list[tuple[int, int, asyncio.Future[None]]]
+        ] = {}
+        self._order = itertools.count()
+
+        self.wait_count: int = 0
+        self.wait_time_total: float = 0.0
+        self.wait_time_max: float = 0.0
+
+    @property
+    def wait_time_average(self) -> float:
+        if self.wait_count == 0:
+            return 0.0
+        return self.wait_time_total / self.wait_count
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get connection slots usage and wait time counters."""
+        return {
+            "slots_per_adapter": self._slots_per_adapter,
+            "adapter_slots": dict(self._adapter_slots),
+            "active": dict(self._active),
+            "queued": {
+                source: len(waiters)
+                for source, waiters in self._waiters.items()
+                if waiters
+            },
+            "wait_count": self.wait_count,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_average": self.wait_time_average,
+            "wait_time_max": self.wait_time_max,
+        }
+
+    def set_adapter_slots(self, source: str, slots: int) -> None:
+        """Override number of concurrent connection attempts for adapter."""
+        self._adapter_slots[source] = slots
+
+    def queued(self, source: str) -> int:
+        """Get number of connection attempts waiting for adapter."""
+        return len(self._waiters.get(source, []))
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        source: str,
+        priority: TuyaBLEConnectPriority = TuyaBLEConnectPriority.USER,
+    ) -> AsyncIterator[None]:
+        """Hold a connection slot of the adapter."""
+        start = time.monotonic()
+        await self._acquire(source, priority)
+        wait_time = time.monotonic() - start
+        self.wait_count += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        if wait_time > 0.1:
+            _LOGGER.debug(
+                "%s: Waited %.2fs for connection slot, %s still queued",
+                source,
+                wait_time,
+                self.queued(source),
+            )
+        try:
+            yield
+        finally:
+            self._release(source)
+
+    async def _acquire(self, source: str, priority: TuyaBLEConnectPriority) -> None:
+        active = self._active.get(source, 0)
+        waiters = self._waiters.setdefault(source, [])
+        if not waiters and active < self._adapter_slots.get(
+            source, self._slots_per_adapter
+        ):
+            self._active[source] = active + 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._order), future)
+        heapq.heappush(waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was already handed over to us, pass it on.
+                self._release(source)
+            elif entry in waiters:
+                waiters.remove(entry)
+                heapq.heapify(waiters)
+            raise
+
+    def _release(self, source: str) -> None:
+        waiters = self._waiters.get(source)
+        while waiters:
+            _, _, future = heapq.heappop(waiters)
+            if not future.done():
+                # Hand the slot over without releasing it.
+                future.set_result(None)
+                return
+        self._active[source] -= 1
+        if self._active[source] <= 0:
+            del self._active[source]
+
+
+class TuyaBLEReconnectPolicy:
+    """Exponential backoff with jitter and circuit breaker for reconnects."""
+
+    def __init__(
+        self,
+        base_delay: float = RECONNECT_BASE_DELAY,
+        max_delay: float = RECONNECT_MAX_DELAY,
+        failure_threshold: int = RECONNECT_FAILURE_THRESHOLD,
+    ) -> None:
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._failure_threshold = failure_threshold
+        self._failures: int = 0
+        self._opened_at: float | None = None
+        self._half_open_after: float = 0.0
+        self._half_open_used: bool = False
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while circuit breaker blocks further attempts."""
+        return (
+            self._opened_at is not None
+            and time.monotonic() - self._opened_at < self._max_delay
+        )
+
+    def _step_delay(self) -> float:
+        if self._failures == 0:
+            return 0.0
+        return min(
+            self._max_delay,
+            self._base_delay * 2 ** min(self._failures - 1, 16),
+        )
+
+    def next_delay(self) -> float:
+        """Get jittered delay before the next attempt."""
+        delay = self._step_delay()
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+            self._half_open_after = self.next_delay()
+            self._half_open_used = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._half_open_used = False
+
+    def reset(self) -> None:
+        """Let an open circuit breaker make one early attempt."""
+        if self._opened_at is None or self._half_open_used:
+            return
+        if time.monotonic() - self._opened_at < self._half_open_after:
+            return
+        # Half-open: failures are kept, so the next failure opens the
+        # breaker again with a longer backoff step.
+        self._half_open_used = True
+        self._opened_at = None
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait(self) -> None:
+        """Sleep before the next attempt, or until the breaker is reset."""
+        if self._opened_at is not None:
+            delay = max(0.0, self._max_delay - (time.monotonic() - self._opened_at))
+        else:
+            delay = self.next_delay()
+        wakeup = asyncio.Event()
+        self._wakeup = wakeup
+        try:
+            await asyncio.wait_for(wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            if self._wakeup is wakeup:
+                self._wakeup = None
+        # Woken by an advertisement, spread devices seen at the same moment.
+        await asyncio.sleep(random.uniform(0, self._step_delay() / 2))
@@ -5,7 +5,10 @@ import hashlib
 import logging
 import secrets
 import time
+from collections import deque
 from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
 from struct import pack, unpack
 
 from bleak.backends.device import BLEDevice
@@ -22,13 +25,21 @@ from bleak_retry_connector import (
 from Crypto.Cipher import AES
 
 from .const import (
+    ADVERTISEMENT_CACHE_SIZE,
+    ATT_HEADER_SIZE,
     CHARACTERISTIC_NOTIFY,
     CHARACTERISTIC_WRITE,
+    DATAPOINTS_COALESCE_DELAY,
     GATT_MTU,
+    GATT_WRITE_WINDOW,
+    HANDSHAKE_MIN_TIMEOUT,
+    HANDSHAKE_TIMEOUT_FACTOR,
+    INPUT_FRAME_MAX_LENGTH,
     MANUFACTURER_DATA_ID,
     RESPONSE_WAIT_TIMEOUT,
     SERVICE_UUID,
     TuyaBLECode,
+    TuyaBLEConnectPriority,
     TuyaBLEDataPointType,
 )
 from .exceptions import (
@@ -39,6 +50,11 @@ from .exceptions import (
     TuyaBLEEnumValueError,
 )
 from .manager import AbstaractTuyaBLEDeviceManager, TuyaBLEDeviceCredentials
+from .scheduler import (
+    TuyaBLEConnectScheduler,
+    TuyaBLEReconnectPolicy,
+    get_ble_device_source,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,7 +62,67 @@ _LOGGER = logging.getLogger(__name__)
 BLEAK_EXCEPTIONS = (*BLEAK_RETRY_EXCEPTIONS, OSError)
 
 
+def _build_crc16_table() -> tuple[int, ...]:
+    """Build lookup table for CRC-16/MODBUS (reflected 0xA001 polynomial)."""
+    table: list[int] = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+
+class TuyaBLECipher:
+    """AES-CBC cipher that expands its key once and is reused for every frame."""
+
+    # Longer frames are faster to chain inside a one-off native CBC cipher.
+    MAX_CHAINED_ENCRYPT_LENGTH = 64
+
+    def __init__(self, key: bytes) -> None:
+        self._key = key
+        self._cipher = AES.new(key, AES.MODE_ECB)
+
+    def encrypt(self, iv: bytes, data: bytes) -> bytes:
+        if len(data) > self.MAX_CHAINED_ENCRYPT_LENGTH:
+            return AES.new(self._key, AES.MODE_CBC, iv).encrypt(data)
+        result = bytearray()
+        prev = int.from_bytes(iv, "big")
+        for pos in range(0, len(data), 16):
+            block = int.from_bytes(data[pos:pos + 16], "big")  # fmt: skip
+            encrypted = self._cipher.encrypt((block ^ prev).to_bytes(16, "big"))
+            prev = int.from_bytes(encrypted, "big")
+            result += encrypted
+        return bytes(result)
+
+    def decrypt(self, iv: bytes, data: bytes) -> bytes:
+        length = len(data)
+        if length == 0:
+            return bytes()
+        decrypted = self._cipher.decrypt(data)
+        chain = (int.from_bytes(iv, "big") << ((length - 16) * 8)) | int.from_bytes(
+            data[:length - 16], "big"  # fmt: skip
+        )
+        return (int.from_bytes(decrypted, "big") ^ chain).to_bytes(length, "big")
+
+
 class TuyaBLEDataPoint:
+    __slots__ = (
+        "_owner",
+        "_id",
+        "_timestamp",
+        "_flags",
+        "_type",
+        "_value",
+        "_changed_by_device",
+    )
+
     def __init__(
         self,
         owner: TuyaBLEDataPoints,
@@ -140,11 +216,22 @@ class TuyaBLEDataPoint:
 
 
 class TuyaBLEDataPoints:
+    __slots__ = (
+        "_owner",
+        "_datapoints",
+        "_update_started",
+        "_updated_datapoints",
+        "_coalesced_datapoints",
+        "_coalesce_task",
+    )
+
     def __init__(self, owner: TuyaBLEDevice) -> None:
         self._owner = owner
         self._datapoints: dict[int, TuyaBLEDataPoint] = {}
         self._update_started: int = 0
         self._updated_datapoints: list[int] = []
+        self._coalesced_datapoints: list[int] = []
+        self._coalesce_task: asyncio.Task[None] | None = None
 
     def __len__(self) -> int:
         return len(self._datapoints)
@@ -202,10 +289,91 @@ class TuyaBLEDataPoints:
                 self._updated_datapoints.remove(dp_id)
             self._updated_datapoints.append(dp_id)
         else:
-            await self._owner._send_datapoints([dp_id])
+            if dp_id in self._coalesced_datapoints:
+                self._coalesced_datapoints.remove(dp_id)
+            self._coalesced_datapoints.append(dp_id)
+            if self._coalesce_task is None:
+                self._coalesce_task = asyncio.create_task(self._send_coalesced())
+            await asyncio.shield(self._coalesce_task)
+
+    async def _send_coalesced(self) -> None:
+        """Send all datapoints changed by user within coalescing window."""
+        await asyncio.sleep(DATAPOINTS_COALESCE_DELAY)
+        self._coalesce_task = None
+        datapoint_ids = self._coalesced_datapoints
+        self._coalesced_datapoints = []
+        await self._owner._send_datapoints(datapoint_ids)
+
+
+@dataclass
+class TuyaBLESessionInfo:
+    """Parameters negotiated during the last successful handshake."""
+
+    protocol_version: int
+    flags: int
+    is_bound: bool
+    device_version: str
+    protocol_version_str: str
+    hardware_version: str
+    handshake_time: float
+
+
+global_connect_scheduler = TuyaBLEConnectScheduler()
+
+# Datapoint types and value decoders indexed by raw datapoint type
+_DATAPOINT_TYPES: tuple[TuyaBLEDataPointType, ...] = tuple(
+    sorted(TuyaBLEDataPointType, key=lambda type: type.value)
+)
+_DATAPOINT_DECODERS: tuple[Callable[[memoryview], bytes | bool | int | str], ...] = (
+    bytes,  # DT_RAW
+    lambda raw: int.from_bytes(raw, "big") != 0,  # DT_BOOL
+    lambda raw: int.from_bytes(raw, "big", signed=True),  # DT_VALUE
+    lambda raw: str(raw, "utf-8"),  # DT_STRING
+    lambda raw: int.from_bytes(raw, "big", signed=True),  # DT_ENUM
+    bytes,  # DT_BITMAP
+)
 
 
-global_connect_lock = asyncio.Lock()
+@lru_cache(maxsize=ADVERTISEMENT_CACHE_SIZE)
+def _decode_advertisement_payload(
+    service_data: bytes | None, manufacturer_data: bytes | None
+) -> tuple[bool | None, int | None, str | None]:
+    """Decode bound flag, protocol version and UUID from advertisement."""
+    raw_product_id: bytes | None = None
+    # raw_product_key: bytes | None = None
+    is_bound: bool | None = None
+    protocol_version: int | None = None
+    uuid: str | None = None
+
+    if service_data and len(service_data) > 1:
+        match service_data[0]:
+            case 0:
+                raw_product_id = service_data[1:]
+            # case 1:
+            #    raw_product_key = service_data[1:]
+
+    if manufacturer_data and len(manufacturer_data) > 6:
+        is_bound = (manufacturer_data[0] & 0x80) != 0
+        protocol_version = manufacturer_data[1]
+        raw_uuid = manufacturer_data[6:]
+        if raw_product_id:
+            key = hashlib.md5(raw_product_id).digest()
+            try:
+                cipher = AES.new(key, AES.MODE_CBC, key)
+                uuid = cipher.decrypt(raw_uuid).decode("utf-8")
+            except (ValueError, UnicodeDecodeError):
+                _LOGGER.debug("Unexpected UUID in advertisement: %s", raw_uuid.hex())
+
+    return (is_bound, protocol_version, uuid)
+
+
+def get_advertisement_cache_info() -> tuple[int, int, int | None, int]:
+    """Get hit/miss counters of the advertisement decoding cache."""
+    return _decode_advertisement_payload.cache_info()
+
+
+# Handshake results of devices, kept across reconnects and config entry reloads
+global_sessions: dict[str, TuyaBLESessionInfo] = {}
 
 
 class TuyaBLEDevice:
@@ -214,6 +382,7 @@ class TuyaBLEDevice:
         device_manager: AbstaractTuyaBLEDeviceManager,
         ble_device: BLEDevice,
         advertisement_data: AdvertisementData | None = None,
+        write_window: int = GATT_WRITE_WINDOW,
     ) -> None:
         """Init the TuyaBLE."""
         self._device_manager = device_manager
@@ -221,13 +390,20 @@ class TuyaBLEDevice:
         self._ble_device = ble_device
         self._advertisement_data = advertisement_data
         self._operation_lock = asyncio.Lock()
+        self._write_window = write_window
         self._connect_lock = asyncio.Lock()
         self._client: BleakClientWithServiceCache | None = None
+        self._gatt_mtu = GATT_MTU
         self._expected_disconnect = False
+        self._timed_disconnect = False
+        self._idle_disconnect_delay: float | None = None
+        self._idle_disconnect_timer: asyncio.TimerHandle | None = None
+        self._reconnect_policy = TuyaBLEReconnectPolicy()
         self._connected_callbacks: list[Callable[[], None]] = []
         self._callbacks: list[Callable[[list[TuyaBLEDataPoint]], None]] = []
         self._disconnected_callbacks: list[Callable[[], None]] = []
         self._current_seq_num = 1
+        self._current_dp_seq_num = 1
         self._seq_num_lock = asyncio.Lock()
 
         self._is_bound = False
@@ -244,10 +420,12 @@ class TuyaBLEDevice:
         self._local_key: bytes | None = None
         self._login_key: bytes | None = None
         self._session_key: bytes | None = None
+        self._ciphers: dict[bytes, TuyaBLECipher] = {}
 
         self._is_paired = False
 
         self._input_buffer: bytearray | None = None
+        self._input_received_length = 0
         self._input_expected_packet_num = 0
         self._input_expected_length = 0
         self._input_expected_responses: dict[int,
@@ -256,12 +434,57 @@ class TuyaBLEDevice:
 
         self._datapoints = TuyaBLEDataPoints(self)
 
+        self._advertisement_payload: tuple[bytes | None, bytes | None] | None = None
+
+        self._session: TuyaBLESessionInfo | None = None
+        session = global_sessions.get(ble_device.address)
+        if session:
+            self._restore_session(session)
+
+    def _restore_session(self, session: TuyaBLESessionInfo) -> None:
+        """Restore device parameters from a previous handshake."""
+        self._session = session
+        self._protocol_version = session.protocol_version
+        self._flags = session.flags
+        self._is_bound = session.is_bound
+        self._device_version = session.device_version
+        self._protocol_version_str = session.protocol_version_str
+        self._hardware_version = session.hardware_version
+
+    def _store_session(self, handshake_time: float) -> None:
+        """Remember parameters negotiated during the handshake."""
+        self._session = TuyaBLESessionInfo(
+            self._protocol_version,
+            self._flags,
+            self._is_bound,
+            self._device_version,
+            self._protocol_version_str,
+            self._hardware_version,
+            handshake_time,
+        )
+        global_sessions[self.address] = self._session
+
+    def _get_handshake_timeout(self) -> float:
+        """Get response timeout for handshake requests."""
+        if self._session is None:
+            return RESPONSE_WAIT_TIMEOUT
+        return min(
+            RESPONSE_WAIT_TIMEOUT,
+            max(
+                HANDSHAKE_MIN_TIMEOUT,
+                self._session.handshake_time * HANDSHAKE_TIMEOUT_FACTOR,
+            ),
+        )
+
     def set_ble_device_and_advertisement_data(
         self, ble_device: BLEDevice, advertisement_data: AdvertisementData
     ) -> None:
         """Set the ble device."""
         self._ble_device = ble_device
         self._advertisement_data = advertisement_data
+        self._reconnect_policy.reset()
+        if self._device_info is not None:
+            self._decode_advertisement_data()
 
     async def initialize(self) -> None:
         _LOGGER.debug("%s: Initializing", self.address)
@@ -289,9 +512,14 @@ class TuyaBLEDevice:
             TuyaBLECode.FUN_SENDER_PAIR, self._build_pairing_request()
         )
 
-    async def update(self) -> None:
+    async def update(
+        self,
+        priority: TuyaBLEConnectPriority = TuyaBLEConnectPriority.USER,
+    ) -> None:
         _LOGGER.debug("%s: Updating", self.address)
-        await self._send_packet(TuyaBLECode.FUN_SENDER_DEVICE_STATUS, bytes())
+        await self._send_packet(
+            TuyaBLECode.FUN_SENDER_DEVICE_STATUS, bytes(), priority=priority
+        )
 
     async def _update_device_info(self) -> bool:
         if self._device_info is None:
@@ -306,33 +534,31 @@ class TuyaBLEDevice:
         return self._device_info is not None
 
     def _decode_advertisement_data(self) -> None:
-        raw_product_id: bytes | None = None
-        # raw_product_key: bytes | None = None
-        raw_uuid: bytes | None = None
+        service_data: bytes | None = None
+        manufacturer_data: bytes | None = None
         if self._advertisement_data:
             if self._advertisement_data.service_data:
                 service_data = self._advertisement_data.service_data.get(
                     SERVICE_UUID)
-                if service_data and len(service_data) > 1:
-                    match service_data[0]:
-                        case 0:
-                            raw_product_id = service_data[1:]
-                        # case 1:
-                        #    raw_product_key = service_data[1:]
-
             if self._advertisement_data.manufacturer_data:
                 manufacturer_data = self._advertisement_data.manufacturer_data.get(
                     MANUFACTURER_DATA_ID
                 )
-                if manufacturer_data and len(manufacturer_data) > 6:
-                    self._is_bound = (manufacturer_data[0] & 0x80) != 0
-                    self._protocol_version = manufacturer_data[1]
-                    raw_uuid = manufacturer_data[6:]
-                    if raw_product_id:
-                        key = hashlib.md5(raw_product_id).digest()
-                        cipher = AES.new(key, AES.MODE_CBC, key)
-                        raw_uuid = cipher.decrypt(raw_uuid)
-                        self._uuid = raw_uuid.decode("utf-8")
+
+        payload = (
+            bytes(service_data) if service_data else None,
+            bytes(manufacturer_data) if manufacturer_data else None,
+        )
+        if payload == self._advertisement_payload:
+            return
+        self._advertisement_payload = payload
+
+        is_bound, protocol_version, uuid = _decode_advertisement_payload(*payload)
+        if is_bound is not None:
+            self._is_bound = is_bound
+            self._protocol_version = protocol_version
+        if uuid is not None:
+            self._uuid = uuid
 
     @property
     def address(self) -> str:
@@ -489,8 +715,19 @@ class TuyaBLEDevice:
 
     def _disconnected(self, client: BleakClientWithServiceCache) -> None:
         """Disconnected callback."""
+        if self._client is not None and client is not self._client:
+            # Late report about a client dropped before reconnecting.
+            return
         was_paired = self._is_paired
         self._is_paired = False
+        self._gatt_mtu = GATT_MTU
+        if self._timed_disconnect:
+            _LOGGER.debug(
+                "%s: Disconnected on purpose; RSSI: %s",
+                self.address,
+                self.rssi,
+            )
+            return
         self._fire_disconnected_callbacks()
         if self._expected_disconnect:
             _LOGGER.debug(
@@ -519,14 +756,61 @@ class TuyaBLEDevice:
 
     async def _execute_timed_disconnect(self) -> None:
         """Execute timed disconnection."""
-        _LOGGER.debug(
-            "%s: Disconnecting",
-            self.address,
-        )
-        await self._execute_disconnect()
+        self._idle_disconnect_timer = None
+        if self._operation_lock.locked() or self._input_expected_responses:
+            self._reschedule_idle_disconnect()
+            return
+        async with self._connect_lock:
+            if self._client is None or self._expected_disconnect:
+                return
+            _LOGGER.debug(
+                "%s: Disconnecting after %ss of inactivity",
+                self.address,
+                self._idle_disconnect_delay,
+            )
+            await self._drop_connection()
+        async with self._seq_num_lock:
+            self._current_seq_num = 1
+
+    async def _drop_connection(self) -> None:
+        """Disconnect without reconnecting or reporting device as gone."""
+        client = self._client
+        self._timed_disconnect = True
+        self._client = None
+        self._is_paired = False
+        if client is not None and client.is_connected:
+            try:
+                await client.stop_notify(CHARACTERISTIC_NOTIFY)
+                await client.disconnect()
+            except BLEAK_EXCEPTIONS:
+                _LOGGER.debug("%s: Disconnecting failed", self.address, exc_info=True)
+
+    def _reschedule_idle_disconnect(self) -> None:
+        """Restart countdown to disconnection of idle device."""
+        if self._idle_disconnect_timer is not None:
+            self._idle_disconnect_timer.cancel()
+            self._idle_disconnect_timer = None
+        if self._idle_disconnect_delay and not self._expected_disconnect:
+            self._idle_disconnect_timer = asyncio.get_running_loop().call_later(
+                self._idle_disconnect_delay, self._disconnect
+            )
+
+    @property
+    def idle_disconnect_delay(self) -> float | None:
+        """Seconds without traffic before the connection is dropped."""
+        return self._idle_disconnect_delay
+
+    @idle_disconnect_delay.setter
+    def idle_disconnect_delay(self, delay: float | None) -> None:
+        self._idle_disconnect_delay = delay
+        if self._client is not None:
+            self._reschedule_idle_disconnect()
 
     async def _execute_disconnect(self) -> None:
         """Execute disconnection."""
+        if self._idle_disconnect_timer is not None:
+            self._idle_disconnect_timer.cancel()
+            self._idle_disconnect_timer = None
         async with self._connect_lock:
             client = self._client
             self._expected_disconnect = True
@@ -537,9 +821,11 @@ class TuyaBLEDevice:
         async with self._seq_num_lock:
             self._current_seq_num = 1
 
-    async def _ensure_connected(self) -> None:
+    async def _ensure_connected(
+        self,
+        priority: TuyaBLEConnectPriority = TuyaBLEConnectPriority.USER,
+    ) -> None:
         """Ensure connection to device is established."""
-        global global_connect_lock
         if self._expected_disconnect:
             return
         if self._connect_lock.locked():
@@ -556,18 +842,23 @@ class TuyaBLEDevice:
             await asyncio.sleep(0.01)
             if self._client and self._client.is_connected and self._is_paired:
                 return
-            attempts_count = 100
-            while attempts_count > 0:
-                attempts_count -= 1
-                if attempts_count == 0:
-                    _LOGGER.error(
-                        "%s: Connecting, all attempts failed; RSSI: %s",
-                        self.address,
-                        self.rssi,
-                    )
-                    raise BleakNotFoundError()
+            attempts_count = 0
+            while True:
+                if attempts_count > 0:
+                    self._reconnect_policy.record_failure()
+                    if self._reconnect_policy.is_open:
+                        _LOGGER.error(
+                            "%s: Connecting, all attempts failed; RSSI: %s",
+                            self.address,
+                            self.rssi,
+                        )
+                        raise BleakNotFoundError()
+                    await asyncio.sleep(self._reconnect_policy.next_delay())
+                attempts_count += 1
                 try:
-                    async with global_connect_lock:
+                    async with global_connect_scheduler.slot(
+                        get_ble_device_source(self._ble_device), priority
+                    ):
                         _LOGGER.debug(
                             "%s: Connecting; RSSI: %s", self.address, self.rssi
                         )
@@ -601,18 +892,22 @@ class TuyaBLEDevice:
                     _LOGGER.debug("%s: Connected; RSSI: %s",
                                   self.address, self.rssi)
                     self._client = client
+                    self._timed_disconnect = False
+                    self._gatt_mtu = self._get_gatt_mtu(client)
                     try:
                         await self._client.start_notify(
                             CHARACTERISTIC_NOTIFY, self._notification_handler
                         )
                     except:  # [BLEAK_EXCEPTIONS, BleakNotFoundError]:
-                        self._client = None
+                        await self._drop_connection()
                         _LOGGER.error("%s: starting notifications failed",
                                       self.address, exc_info=True)
                         continue
                 else:
                     continue
 
+                handshake_start = time.monotonic()
+                handshake_timeout = self._get_handshake_timeout()
                 if self._client and self._client.is_connected:
                     _LOGGER.debug(
                         "%s: Sending device info request", self.address)
@@ -622,15 +917,16 @@ class TuyaBLEDevice:
                             bytes(0),
                             0,
                             True,
+                            handshake_timeout,
                         ):
-                            self._client = None
+                            await self._drop_connection()
                             _LOGGER.error(
                                 "%s: Sending device info request failed",
                                 self.address,
                             )
                             continue
                     except:  # [BLEAK_EXCEPTIONS, BleakNotFoundError]:
-                        self._client = None
+                        await self._drop_connection()
                         _LOGGER.error("%s: Sending device info request failed",
                                       self.address, exc_info=True)
                         continue
@@ -645,27 +941,32 @@ class TuyaBLEDevice:
                             self._build_pairing_request(),
                             0,
                             True,
+                            handshake_timeout,
                         ):
-                            self._client = None
+                            await self._drop_connection()
                             _LOGGER.error(
                                 "%s: Sending pairing request failed",
                                 self.address,
                             )
                             continue
                     except:  # [BLEAK_EXCEPTIONS, BleakNotFoundError]:
-                        self._client = None
+                        await self._drop_connection()
                         _LOGGER.error("%s: Sending pairing request failed",
                                       self.address, exc_info=True)
                         continue
                 else:
                     continue
 
+                if self._is_paired:
+                    self._reconnect_policy.record_success()
+                    self._store_session(time.monotonic() - handshake_start)
                 break
 
         if self._client:
             if self._client.is_connected:
                 if self._is_paired:
                     _LOGGER.debug("%s: Successfully connected", self.address)
+                    self._reschedule_idle_disconnect()
                     self._fire_connected_callbacks()
                 else:
                     _LOGGER.error("%s: Connected but not paired", self.address)
@@ -674,6 +975,15 @@ class TuyaBLEDevice:
         else:
             _LOGGER.error("%s: No client device", self.address)
 
+    def _get_gatt_mtu(self, client: BleakClientWithServiceCache) -> int:
+        """Get payload size of a single write for the negotiated ATT MTU."""
+        try:
+            mtu_size = client.mtu_size
+        except Exception:
+            mtu_size = 0
+        _LOGGER.debug("%s: Negotiated MTU: %s", self.address, mtu_size)
+        return max(GATT_MTU, mtu_size - ATT_HEADER_SIZE)
+
     async def _reconnect(self) -> None:
         """Attempt a reconnect"""
         _LOGGER.debug("%s: Reconnect, ensuring connection", self.address)
@@ -682,7 +992,7 @@ class TuyaBLEDevice:
         try:
             if self._expected_disconnect:
                 return
-            await self._ensure_connected()
+            await self._ensure_connected(TuyaBLEConnectPriority.BACKGROUND)
             if self._expected_disconnect:
                 return
             _LOGGER.debug("%s: Reconnect, connection ensured", self.address)
@@ -692,20 +1002,16 @@ class TuyaBLEDevice:
                 self.address,
                 exc_info=True,
             )
-            await asyncio.sleep(BLEAK_BACKOFF_TIME)
+            await self._reconnect_policy.wait()
             _LOGGER.debug("%s: Reconnecting again", self.address)
             asyncio.create_task(self._reconnect())
 
     @staticmethod
     def _calc_crc16(data: bytes) -> int:
         crc = 0xFFFF
+        table = _CRC16_TABLE
         for byte in data:
-            crc ^= byte & 255
-            for _ in range(8):
-                tmp = crc & 1
-                crc >>= 1
-                if tmp != 0:
-                    crc ^= 0xA001
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
         return crc
 
     @staticmethod
@@ -765,8 +1071,7 @@ class TuyaBLEDevice:
         while len(raw) % 16 != 0:
             raw += b"\x00"
 
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        encrypted = security_flag + iv + cipher.encrypt(raw)
+        encrypted = security_flag + iv + self._get_cipher(key).encrypt(iv, raw)
 
         command = []
         packet_num = 0
@@ -781,7 +1086,7 @@ class TuyaBLEDevice:
                 packet += pack(">B", self._protocol_version << 4)
 
             data_part = encrypted[
-                pos:pos + GATT_MTU - len(packet)  # fmt: skip
+                pos:pos + self._gatt_mtu - len(packet)  # fmt: skip
             ]
             packet += data_part
             command.append(packet)
@@ -803,11 +1108,12 @@ class TuyaBLEDevice:
         data: bytes,
         wait_for_response: bool = True,
         # retry: int | None = None,
+        priority: TuyaBLEConnectPriority = TuyaBLEConnectPriority.USER,
     ) -> None:
         """Send packet to device and optional read response."""
         if self._expected_disconnect:
             return
-        await self._ensure_connected()
+        await self._ensure_connected(priority)
         if self._expected_disconnect:
             return
         await self._send_packet_while_connected(code, data, 0, wait_for_response)
@@ -828,6 +1134,7 @@ class TuyaBLEDevice:
         data: bytes,
         response_to: int,
         wait_for_response: bool,
+        timeout: float = RESPONSE_WAIT_TIMEOUT,
         # retry: int | None = None
     ) -> bool:
         """Send packet to device and optional read response."""
@@ -856,9 +1163,10 @@ class TuyaBLEDevice:
         packets: list[bytes] = self._build_packets(
             seq_num, code, data, response_to)
         await self._int_send_packet_while_connected(packets)
+        self._reschedule_idle_disconnect()
         if future:
             try:
-                await asyncio.wait_for(future, RESPONSE_WAIT_TIMEOUT)
+                await asyncio.wait_for(future, timeout)
             except asyncio.TimeoutError:
                 _LOGGER.error(
                     "%s: timeout receiving response, RSSI: %s",
@@ -943,31 +1251,61 @@ class TuyaBLEDevice:
 
     async def _int_send_packets_locked(self, packets: list[bytes]) -> None:
         """Execute command and read response."""
-        for packet in packets:
-            if self._client:
-                try:
-                    # _LOGGER.debug("%s: Sending packet: %s", self.address, packet.hex())
-                    await self._client.write_gatt_char(
-                        CHARACTERISTIC_WRITE,
-                        packet,
-                        False,
-                    )
-                except:
+        pending: deque[asyncio.Task[None]] = deque()
+        try:
+            for packet in packets:
+                if not self._client:
                     _LOGGER.error(
-                        "%s: Error during sending packet",
+                        "%s: Client disconnected during sending packet",
                         self.address,
                         exc_info=True,
                     )
-                    if self._client and self._client.is_connected:
-                        self._disconnected(self._client)
                     raise BleakError()
-            else:
-                _LOGGER.error(
-                    "%s: Client disconnected during sending packet",
-                    self.address,
-                    exc_info=True,
+                # _LOGGER.debug("%s: Sending packet: %s", self.address, packet.hex())
+                pending.append(
+                    asyncio.create_task(
+                        self._client.write_gatt_char(
+                            CHARACTERISTIC_WRITE,
+                            packet,
+                            False,
+                        )
+                    )
                 )
-                raise BleakError()
+                if len(pending) >= self._write_window:
+                    await self._wait_packet_written(pending.popleft())
+            while pending:
+                await self._wait_packet_written(pending.popleft())
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Retrieve results of writes which failed after the first one.
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _wait_packet_written(self, task: asyncio.Task[None]) -> None:
+        """Wait for queued packet write to complete."""
+        try:
+            await task
+        except:
+            _LOGGER.error(
+                "%s: Error during sending packet",
+                self.address,
+                exc_info=True,
+            )
+            if self._client and self._client.is_connected:
+                self._disconnected(self._client)
+            raise BleakError()
+
+    def _get_cipher(self, key: bytes) -> TuyaBLECipher:
+        cipher = self._ciphers.get(key)
+        if cipher is None:
+            cipher = TuyaBLECipher(key)
+            self._ciphers[key] = cipher
+        return cipher
+
+    def _drop_cipher(self, key: bytes | None) -> None:
+        if key is not None:
+            self._ciphers.pop(key, None)
 
     def _get_key(self, security_flag: int) -> bytes:
         if security_flag == 1:
@@ -1010,50 +1348,73 @@ class TuyaBLEDevice:
         )
         return (timestamp, end_pos)
 
-    def _parse_datapoints_v3(
-        self, timestamp: float, flags: int, data: bytes, start_pos: int
-    ) -> int:
-        datapoints: list[TuyaBLEDataPoint] = []
-
+    @staticmethod
+    def _unpack_datapoints(
+        data: bytes, start_pos: int, length_size: int
+    ) -> list[tuple[int, TuyaBLEDataPointType, bytes | bool | int | str]]:
+        """Unpack datapoints, length of each value is length_size bytes."""
+        result: list[tuple[int, TuyaBLEDataPointType, bytes | bool | int | str]] = []
+        types = _DATAPOINT_TYPES
+        decoders = _DATAPOINT_DECODERS
+        view = memoryview(data)
+        data_end = len(view)
+        header_size = 2 + length_size
         pos = start_pos
-        while len(data) - pos >= 4:
-            id: int = data[pos]
-            pos += 1
-            _type: int = data[pos]
-            if _type > TuyaBLEDataPointType.DT_BITMAP.value:
+        while data_end - pos > header_size:
+            _type: int = view[pos + 1]
+            if _type >= len(types):
                 raise TuyaBLEDataFormatError()
-            type: TuyaBLEDataPointType = TuyaBLEDataPointType(_type)
-            pos += 1
-            data_len: int = data[pos]
-            pos += 1
-            next_pos = pos + data_len
-            if next_pos > len(data):
+            if length_size == 1:
+                data_len = view[pos + 2]
+            else:
+                data_len = (view[pos + 2] << 8) | view[pos + 3]
+            value_pos = pos + header_size
+            next_pos = value_pos + data_len
+            if next_pos > data_end:
                 raise TuyaBLEDataLengthError()
-            raw_value = data[pos:next_pos]
-            match type:
-                case (TuyaBLEDataPointType.DT_RAW | TuyaBLEDataPointType.DT_BITMAP):
-                    value = raw_value
-                case TuyaBLEDataPointType.DT_BOOL:
-                    value = int.from_bytes(raw_value, "big") != 0
-                case (TuyaBLEDataPointType.DT_VALUE | TuyaBLEDataPointType.DT_ENUM):
-                    value = int.from_bytes(raw_value, "big", signed=True)
-                case TuyaBLEDataPointType.DT_STRING:
-                    value = raw_value.decode()
-
-            _LOGGER.debug(
-                "%s: Received datapoint update, id: %s, type: %s: value: %s",
-                self.address,
-                id,
-                type.name,
-                value,
+            result.append(
+                (view[pos], types[_type], decoders[_type](view[value_pos:next_pos]))
             )
+            pos = next_pos
+        return result
+
+    def _parse_datapoints(
+        self,
+        timestamp: float,
+        flags: int,
+        data: bytes,
+        start_pos: int,
+        length_size: int,
+    ) -> None:
+        """Parse datapoints, length of each value is length_size bytes."""
+        datapoints: list[TuyaBLEDataPoint] = []
+        values = self._unpack_datapoints(data, start_pos, length_size)
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        for id, type, value in values:
+            if debug:
+                _LOGGER.debug(
+                    "%s: Received datapoint update, id: %s, type: %s: value: %s",
+                    self.address,
+                    id,
+                    type.name,
+                    value,
+                )
             self._datapoints._update_from_device(
                 id, timestamp, flags, type, value)
             datapoints.append(self._datapoints[id])
-            pos = next_pos
 
         self._fire_callbacks(datapoints)
 
+    def _parse_datapoints_v3(
+        self, timestamp: float, flags: int, data: bytes, start_pos: int
+    ) -> None:
+        self._parse_datapoints(timestamp, flags, data, start_pos, 1)
+
+    def _parse_datapoints_v4(
+        self, timestamp: float, flags: int, data: bytes, start_pos: int
+    ) -> None:
+        self._parse_datapoints(timestamp, flags, data, start_pos, 2)
+
     def _handle_command_or_response(
         self, seq_num: int, response_to: int, code: TuyaBLECode, data: bytes
     ) -> None:
@@ -1073,6 +1434,8 @@ class TuyaBLEDevice:
                 self._is_bound = data[5] != 0
 
                 srand = data[6:12]
+                self._drop_cipher(self._session_key)
+                self._drop_cipher(self._auth_key)
                 self._session_key = hashlib.md5(
                     self._local_key + srand).digest()
                 self._auth_key = data[14:46]
@@ -1152,6 +1515,25 @@ class TuyaBLEDevice:
                 data = pack(">HBB", dp_seq_num, flags, 0)
                 asyncio.create_task(self._send_response(code, data, seq_num))
 
+            case TuyaBLECode.FUN_RECEIVE_DP_V4:
+                if len(data) < 6:
+                    raise TuyaBLEDataLengthError()
+                version, dp_seq_num, flags = unpack(">BIB", data[:6])
+                self._parse_datapoints_v4(time.time(), flags, data, 6)
+                data = pack(">BIBB", version, dp_seq_num, flags, 0)
+                asyncio.create_task(self._send_response(code, data, seq_num))
+
+            case TuyaBLECode.FUN_RECEIVE_TIME_DP_V4:
+                timestamp: float
+                pos: int
+                if len(data) < 6:
+                    raise TuyaBLEDataLengthError()
+                version, dp_seq_num, flags = unpack(">BIB", data[:6])
+                timestamp, pos = self._parse_timestamp(data, 6)
+                self._parse_datapoints_v4(timestamp, flags, data, pos)
+                data = pack(">BIBB", version, dp_seq_num, flags, 0)
+                asyncio.create_task(self._send_response(code, data, seq_num))
+
         if response_to != 0:
             future = self._input_expected_responses.pop(response_to, None)
             if future:
@@ -1168,19 +1550,20 @@ class TuyaBLEDevice:
 
     def _clean_input(self) -> None:
         self._input_buffer = None
+        self._input_received_length = 0
         self._input_expected_packet_num = 0
         self._input_expected_length = 0
 
     def _parse_input(self) -> None:
-        security_flag = self._input_buffer[0]
+        buffer = memoryview(self._input_buffer)
+        security_flag = buffer[0]
         key = self._get_key(security_flag)
-        iv = self._input_buffer[1:17]
-        encrypted = self._input_buffer[17:]
+        iv = buffer[1:17]
+        encrypted = buffer[17:]
 
         self._clean_input()
 
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        raw = cipher.decrypt(encrypted)
+        raw = self._get_cipher(key).decrypt(iv, encrypted)
 
         seq_num: int
         response_to: int
@@ -1254,10 +1637,23 @@ class TuyaBLEDevice:
 
         if packet_num == self._input_expected_packet_num:
             if packet_num == 0:
-                self._input_buffer = bytearray()
                 self._input_expected_length, pos = self._unpack_int(data, pos)
                 pos += 1
-            self._input_buffer += data[pos:]
+                if self._input_expected_length > INPUT_FRAME_MAX_LENGTH:
+                    _LOGGER.error(
+                        "%s: Announced length of data in notifications %s "
+                        "exceeds %s",
+                        self.address,
+                        self._input_expected_length,
+                        INPUT_FRAME_MAX_LENGTH,
+                    )
+                    self._clean_input()
+                    return
+                self._input_buffer = bytearray(self._input_expected_length)
+                self._input_received_length = 0
+            fragment = memoryview(data)[pos:]
+            start_pos = self._input_received_length
+            self._input_received_length += len(fragment)
             self._input_expected_packet_num += 1
         else:
             _LOGGER.error(
@@ -1269,21 +1665,27 @@ class TuyaBLEDevice:
             self._clean_input()
             return
 
-        if len(self._input_buffer) > self._input_expected_length:
+        if self._input_received_length > self._input_expected_length:
             _LOGGER.error(
                 "%s: Unexpcted length of data in notifications, "
                 "received %s expected %s",
                 self.address,
-                len(self._input_buffer),
+                self._input_received_length,
                 self._input_expected_length,
             )
             self._clean_input()
             return
-        elif len(self._input_buffer) == self._input_expected_length:
+
+        memoryview(self._input_buffer)[
+            start_pos:self._input_received_length  # fmt: skip
+        ] = fragment
+
+        if self._input_received_length == self._input_expected_length:
+            self._reschedule_idle_disconnect()
             self._parse_input()
 
-    async def _send_datapoints_v3(self, datapoint_ids: list[int]) -> None:
-        """Send new values of datapoints to the device."""
+    def _pack_datapoints(self, datapoint_ids: list[int], length_format: str) -> bytearray:
+        """Pack datapoints, length_format is struct format of the value length."""
         data = bytearray()
         for dp_id in datapoint_ids:
             dp = self._datapoints[dp_id]
@@ -1295,14 +1697,28 @@ class TuyaBLEDevice:
                 dp.type.name,
                 dp.value,
             )
-            data += pack(">BBB", dp.id, int(dp.type.value), len(value))
+            data += pack(">BB" + length_format, dp.id, int(dp.type.value), len(value))
             data += value
+        return data
 
+    async def _send_datapoints_v3(self, datapoint_ids: list[int]) -> None:
+        """Send new values of datapoints to the device."""
+        data = self._pack_datapoints(datapoint_ids, "B")
         await self._send_packet(TuyaBLECode.FUN_SENDER_DPS, data)
 
+    async def _send_datapoints_v4(self, datapoint_ids: list[int]) -> None:
+        """Send new values of datapoints to the device."""
+        dp_seq_num = self._current_dp_seq_num
+        self._current_dp_seq_num = (dp_seq_num + 1) & 0xFFFFFFFF
+        data = bytearray(pack(">BIB", 0, dp_seq_num, 0))
+        data += self._pack_datapoints(datapoint_ids, "H")
+        await self._send_packet(TuyaBLECode.FUN_SENDER_DPS_V4, data)
+
     async def _send_datapoints(self, datapoint_ids: list[int]) -> None:
         """Send new values of datapoints to the device."""
         if self._protocol_version == 3:
             await self._send_datapoints_v3(datapoint_ids)
+        elif self._protocol_version == 4:
+            await self._send_datapoints_v4(datapoint_ids)
         else:
             raise TuyaBLEDeviceError(0)
@@ -0,0 +1,53 @@
+"""Helpers of the benchmark scripts.
+
+Benchmarks are not collected by pytest, run them one by one, e.g.
+``python tests/bench_crc16.py``.
+"""
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+import timeit
+from types import ModuleType
+from typing import Any, Callable
+
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LIBRARY_PATH = os.path.join(ROOT_PATH, "custom_components", "tuya_ble", "tuya_ble")
+
+
+def load_library() -> ModuleType:
+    """Load the protocol library as tuya_ble, without Home Assistant."""
+    module = sys.modules.get("tuya_ble")
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            "tuya_ble",
+            os.path.join(LIBRARY_PATH, "__init__.py"),
+            submodule_search_locations=[LIBRARY_PATH],
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["tuya_ble"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def load_integration() -> None:
+    """Make the integration importable as custom_components.tuya_ble."""
+    if ROOT_PATH not in sys.path:
+        sys.path.insert(0, ROOT_PATH)
+
+
+def measure(func: Callable[[], Any]) -> float:
+    """Get best time of a single call in seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def report(name: str, before: float, after: float, unit: str = "us") -> None:
+    """Print time per call before and after an optimization."""
+    scale = {"s": 1, "ms": 1e3, "us": 1e6}[unit]
+    print(
+        f"{name:<24} {before * scale:10.2f} {unit} -> {after * scale:10.2f} {unit}"
+        f"  x{before / after:.1f}"
+    )
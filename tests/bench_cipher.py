@@ -0,0 +1,45 @@
+"""Benchmark of the cached AES key schedules used for frames."""
+from __future__ import annotations
+
+import importlib
+import os
+
+from Crypto.Cipher import AES
+
+from _bench import load_library, measure
+
+load_library()
+
+tuya_ble_module = importlib.import_module("tuya_ble.tuya_ble")
+
+KEY = os.urandom(16)
+IV = os.urandom(16)
+SIZES = [16, 32, 64, 256]
+
+
+def report_rate(name: str, before: float, after: float) -> None:
+    print(f"{name:<16} {1 / before:10.0f} -> {1 / after:10.0f} frames/s")
+
+
+def main() -> None:
+    cipher = tuya_ble_module.TuyaBLECipher(KEY)
+    for size in SIZES:
+        data = os.urandom(size)
+        encrypted = AES.new(KEY, AES.MODE_CBC, IV).encrypt(data)
+        assert cipher.encrypt(IV, data) == encrypted
+        assert cipher.decrypt(IV, encrypted) == data
+        # Before, a new cipher was created for every frame.
+        report_rate(
+            f"encrypt {size} B",
+            measure(lambda: AES.new(KEY, AES.MODE_CBC, IV).encrypt(data)),
+            measure(lambda: cipher.encrypt(IV, data)),
+        )
+        report_rate(
+            f"decrypt {size} B",
+            measure(lambda: AES.new(KEY, AES.MODE_CBC, IV).decrypt(encrypted)),
+            measure(lambda: cipher.decrypt(IV, encrypted)),
+        )
+
+
+if __name__ == "__main__":
+    main()
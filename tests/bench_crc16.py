@@ -0,0 +1,40 @@
+"""Benchmark of the table-driven CRC16 of the frames."""
+from __future__ import annotations
+
+import os
+
+from _bench import load_library, measure, report
+
+load_library()
+
+from tuya_ble import TuyaBLEDevice  # noqa: E402
+
+SIZES = [16, 64, 256, 1024, 4096]
+
+
+def calc_crc16_bitwise(data: bytes) -> int:
+    """CRC16 as it was computed before the lookup table."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte & 255
+        for _ in range(8):
+            tmp = crc & 1
+            crc >>= 1
+            if tmp != 0:
+                crc ^= 0xA001
+    return crc
+
+
+def main() -> None:
+    for size in SIZES:
+        data = os.urandom(size)
+        assert TuyaBLEDevice._calc_crc16(data) == calc_crc16_bitwise(data)
+        report(
+            f"crc16 {size} B",
+            measure(lambda: calc_crc16_bitwise(data)),
+            measure(lambda: TuyaBLEDevice._calc_crc16(data)),
+        )
+
+
+if __name__ == "__main__":
+    main()
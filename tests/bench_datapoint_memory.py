@@ -0,0 +1,56 @@
+"""Benchmark of memory held by datapoints."""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import Any
+
+from _bench import load_library
+
+load_library()
+
+from tuya_ble import TuyaBLEDataPoint, TuyaBLEDataPointType  # noqa: E402
+
+DATAPOINTS_COUNT = 10000
+
+
+def without_slots(cls: type) -> type:
+    """Copy of the class keeping its attributes in __dict__, as before."""
+    namespace = {
+        name: value
+        for name, value in vars(cls).items()
+        if name not in ("__slots__", "__dict__", "__weakref__", *cls.__slots__)
+    }
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def measure_datapoint_size(cls: type) -> float:
+    """Get bytes allocated per DT_VALUE datapoint, including its values."""
+    now = time.time()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    datapoints: list[Any] = [
+        cls(
+            None,
+            index % 256,
+            now + index,
+            0,
+            TuyaBLEDataPointType.DT_VALUE,
+            1000 + index,
+        )
+        for index in range(DATAPOINTS_COUNT)
+    ]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(datapoints) == DATAPOINTS_COUNT
+    return (end - start) / DATAPOINTS_COUNT
+
+
+def main() -> None:
+    before = measure_datapoint_size(without_slots(TuyaBLEDataPoint))
+    after = measure_datapoint_size(TuyaBLEDataPoint)
+    print(f"TuyaBLEDataPoint {before:10.0f} B/DP -> {after:10.0f} B/DP")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark of parsing a datapoints status frame."""
+from __future__ import annotations
+
+import logging
+from struct import pack
+
+from bleak.backends.device import BLEDevice
+
+from _bench import load_library, measure, report
+
+load_library()
+
+from tuya_ble import (  # noqa: E402
+    AbstaractTuyaBLEDeviceManager,
+    TuyaBLEDataPointType,
+    TuyaBLEDevice,
+)
+from tuya_ble.exceptions import (  # noqa: E402
+    TuyaBLEDataFormatError,
+    TuyaBLEDataLengthError,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATAPOINTS_COUNT = 50
+
+
+class BenchDeviceManager(AbstaractTuyaBLEDeviceManager):
+    async def get_device_credentials(
+        self, address: str, force_update: bool = False, save_data: bool = False
+    ) -> None:
+        return None
+
+
+def build_frame() -> bytes:
+    """Build v3 status frame of DATAPOINTS_COUNT datapoints of all types."""
+    values = [
+        (TuyaBLEDataPointType.DT_BOOL, b"\x01"),
+        (TuyaBLEDataPointType.DT_VALUE, pack(">i", -1234)),
+        (TuyaBLEDataPointType.DT_ENUM, b"\x02"),
+        (TuyaBLEDataPointType.DT_STRING, b"fingerbot"),
+        (TuyaBLEDataPointType.DT_RAW, bytes(range(8))),
+    ]
+    frame = bytearray()
+    for dp_id in range(1, DATAPOINTS_COUNT + 1):
+        type, value = values[dp_id % len(values)]
+        frame += bytes([dp_id, type.value, len(value)]) + value
+    return bytes(frame)
+
+
+def parse_datapoints_v3_per_dp(
+    device: TuyaBLEDevice, timestamp: float, flags: int, data: bytes, start_pos: int
+) -> None:
+    """Parse datapoints as it was done before the table-driven pass."""
+    datapoints = []
+    pos = start_pos
+    while len(data) - pos >= 4:
+        id: int = data[pos]
+        pos += 1
+        _type: int = data[pos]
+        if _type > TuyaBLEDataPointType.DT_BITMAP.value:
+            raise TuyaBLEDataFormatError()
+        type: TuyaBLEDataPointType = TuyaBLEDataPointType(_type)
+        pos += 1
+        data_len: int = data[pos]
+        pos += 1
+        next_pos = pos + data_len
+        if next_pos > len(data):
+            raise TuyaBLEDataLengthError()
+        raw_value = data[pos:next_pos]
+        match type:
+            case (TuyaBLEDataPointType.DT_RAW | TuyaBLEDataPointType.DT_BITMAP):
+                value = raw_value
+            case TuyaBLEDataPointType.DT_BOOL:
+                value = int.from_bytes(raw_value, "big") != 0
+            case (TuyaBLEDataPointType.DT_VALUE | TuyaBLEDataPointType.DT_ENUM):
+                value = int.from_bytes(raw_value, "big", signed=True)
+            case TuyaBLEDataPointType.DT_STRING:
+                value = raw_value.decode()
+
+        _LOGGER.debug(
+            "%s: Received datapoint update, id: %s, type: %s: value: %s",
+            device.address,
+            id,
+            type.name,
+            value,
+        )
+        device._datapoints._update_from_device(id, timestamp, flags, type, value)
+        datapoints.append(device._datapoints[id])
+        pos = next_pos
+
+    device._fire_callbacks(datapoints)
+
+
+def main() -> None:
+    frame = build_frame()
+    device = TuyaBLEDevice(
+        BenchDeviceManager(), BLEDevice("DC:23:4D:01:02:03", "TY", {})
+    )
+    device._parse_datapoints_v3(0.0, 0, frame, 0)
+    assert len(device.datapoints) == DATAPOINTS_COUNT
+    report(
+        f"parse {DATAPOINTS_COUNT} DP frame",
+        measure(lambda: parse_datapoints_v3_per_dp(device, 0.0, 0, frame, 0)),
+        measure(lambda: device._parse_datapoints_v3(0.0, 0, frame, 0)),
+        "ms",
+    )
+
+
+if __name__ == "__main__":
+    main()
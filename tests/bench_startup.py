@@ -0,0 +1,91 @@
+"""Benchmark of looking up entity mappings of devices at startup."""
+from __future__ import annotations
+
+import importlib
+import itertools
+import time
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+from _bench import load_integration, measure, report
+
+load_integration()
+
+from custom_components.tuya_ble import devices  # noqa: E402
+from custom_components.tuya_ble.const import PLATFORMS  # noqa: E402
+
+DEVICES_COUNT = 100
+
+
+def get_mapping_by_device_per_platform(
+    module: ModuleType, device: Any
+) -> list[Any]:
+    """Look up mapping in the table of the platform, as it was done before."""
+    category = module.mapping.get(device.category)
+    if category is not None and category.products is not None:
+        product_mapping = category.products.get(device.product_id)
+        if product_mapping is not None:
+            return product_mapping
+        if category.mapping is not None:
+            return category.mapping
+        else:
+            return []
+    else:
+        return []
+
+
+def main() -> None:
+    start = time.perf_counter()
+    modules = [
+        importlib.import_module(f"custom_components.tuya_ble.{platform.value}")
+        for platform in PLATFORMS
+    ]
+    imported = time.perf_counter()
+    devices.get_mapping_index()
+    compiled = time.perf_counter()
+    print(f"{'import platforms':<24} {(imported - start) * 1e3:10.2f} ms")
+    print(f"{'compile index':<24} {(compiled - imported) * 1e3:10.2f} ms")
+
+    products = [
+        SimpleNamespace(category=category, product_id=product_id)
+        for category, category_info in devices.devices_database.items()
+        for product_id in category_info.products
+    ]
+    fleet = list(itertools.islice(itertools.cycle(products), DEVICES_COUNT))
+
+    def setup_before() -> None:
+        for device in fleet:
+            devices.get_device_product_info(device)
+            for module in modules:
+                get_mapping_by_device_per_platform(module, device)
+
+    def setup_after() -> None:
+        for device in fleet:
+            devices.get_device_product_info(device)
+            for module in modules:
+                module.get_mapping_by_device(device)
+
+    for device in fleet:
+        for module in modules:
+            assert module.get_mapping_by_device(
+                device
+            ) == get_mapping_by_device_per_platform(module, device)
+
+    def setup_forwarded_platforms() -> None:
+        for device in fleet:
+            devices.get_device_product_info(device)
+            for platform in devices.get_device_platforms(device):
+                modules[PLATFORMS.index(platform)].get_mapping_by_device(device)
+
+    before = measure(setup_before)
+    report(f"lookup {DEVICES_COUNT} devices", before, measure(setup_after))
+    # Only platforms having entities are set up since then.
+    report(
+        f"setup {DEVICES_COUNT} devices",
+        before,
+        measure(setup_forwarded_platforms),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Test configuration for the Tuya BLE protocol library."""
+from __future__ import annotations
+
+import importlib.util
+import os
+import sys
+
+import pytest
+from bleak.backends.device import BLEDevice
+
+_ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Tests of the integration import it as custom_components.tuya_ble.
+if _ROOT_PATH not in sys.path:
+    sys.path.insert(0, _ROOT_PATH)
+
+# The protocol library does not depend on Home Assistant, so it is loaded
+# as a standalone package instead of through the integration.
+_LIBRARY_PATH = os.path.join(_ROOT_PATH, "custom_components", "tuya_ble", "tuya_ble")
+
+if "tuya_ble" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        "tuya_ble",
+        os.path.join(_LIBRARY_PATH, "__init__.py"),
+        submodule_search_locations=[_LIBRARY_PATH],
+    )
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules["tuya_ble"] = _module
+    _spec.loader.exec_module(_module)
+
+from tuya_ble import (  # noqa: E402
+    AbstaractTuyaBLEDeviceManager,
+    TuyaBLEDevice,
+    TuyaBLEDeviceCredentials,
+)
+
+DEVICE_ADDRESS = "DC:23:4D:01:02:03"
+DEVICE_CREDENTIALS = TuyaBLEDeviceCredentials(
+    "tuya0123456789ab",
+    "0123456789abcdef",
+    "bf0123456789abcdef",
+    "szjqr",
+    "3yqdo5yt",
+    "Fingerbot",
+    None,
+    None,
+)
+
+
+class FakeDeviceManager(AbstaractTuyaBLEDeviceManager):
+    async def get_device_credentials(
+        self,
+        address: str,
+        force_update: bool = False,
+        save_data: bool = False,
+    ) -> TuyaBLEDeviceCredentials | None:
+        return DEVICE_CREDENTIALS
+
+
+@pytest.fixture
+def device() -> TuyaBLEDevice:
+    return TuyaBLEDevice(
+        FakeDeviceManager(),
+        BLEDevice(DEVICE_ADDRESS, "TY", {}),
+    )
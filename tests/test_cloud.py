@@ -0,0 +1,424 @@
+"""Tests for the cloud credentials cache of the Tuya BLE integration."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.components.tuya.const import (  # noqa: E402
+    CONF_APP_TYPE,
+    CONF_ENDPOINT,
+    DOMAIN as TUYA_DOMAIN,
+)
+from homeassistant.const import (  # noqa: E402
+    CONF_COUNTRY_CODE,
+    CONF_DEVICE_ID,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+)
+
+from custom_components.tuya_ble import cloud  # noqa: E402
+from custom_components.tuya_ble.const import (  # noqa: E402
+    CLOUD_CACHE_TTL,
+    CONF_ACCESS_ID,
+    CONF_ACCESS_SECRET,
+    CONF_AUTH_TYPE,
+    CONF_LOCAL_KEY,
+    DOMAIN,
+    TUYA_API_CONCURRENCY,
+    TUYA_FACTORY_INFO_BATCH_SIZE,
+    TUYA_TOKEN_REFRESH_MARGIN,
+)
+
+LOGIN = {
+    CONF_ENDPOINT: "https://openapi.tuyaeu.com",
+    CONF_ACCESS_ID: "access-id",
+    CONF_ACCESS_SECRET: "access-secret",
+    CONF_AUTH_TYPE: 0,
+    CONF_USERNAME: "user@example.com",
+    CONF_PASSWORD: "password",
+    CONF_COUNTRY_CODE: "44",
+    CONF_APP_TYPE: "smartlife",
+}
+
+
+def _mac(index: int) -> str:
+    return f"DC234D{index:06X}"
+
+
+def _address(index: int) -> str:
+    mac = _mac(index)
+    return ":".join(mac[i : i + 2] for i in range(0, 12, 2))
+
+
+class FakeCloud:
+    """Tuya cloud account shared by all API instances of a test."""
+
+    def __init__(self, device_count: int) -> None:
+        self.set_device_count(device_count)
+        self.failing: set[str] = set()
+        self.connects = 0
+        self.factory_info_requests: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def set_device_count(self, device_count: int) -> None:
+        self.devices = [
+            {
+                "id": f"bf{index:04d}",
+                "uuid": f"uuid{index:04d}",
+                "local_key": f"key{index:04d}",
+                "category": "szjqr",
+                "product_id": "3yqdo5yt",
+                "name": f"Fingerbot {index}",
+                "model": "",
+                "product_name": "Fingerbot",
+            }
+            for index in range(device_count)
+        ]
+        self.macs = {
+            device["id"]: _mac(index) for index, device in enumerate(self.devices)
+        }
+
+    def get(self, path: str) -> dict[str, Any]:
+        url = urlparse(path)
+        if url.path.endswith("/devices"):
+            return {"success": True, "result": self.devices}
+        device_ids = parse_qs(url.query)["device_ids"][0].split(",")
+        with self._lock:
+            self.factory_info_requests.append(device_ids)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        if self.failing.intersection(device_ids):
+            return {"success": False, "code": 40000309, "msg": "rate limited"}
+        # Results are not in the order of the request.
+        return {
+            "success": True,
+            "result": [
+                {"id": device_id, "mac": self.macs[device_id]}
+                for device_id in reversed(device_ids)
+            ],
+        }
+
+
+class FakeTuyaOpenAPI:
+    def __init__(
+        self,
+        fake_cloud: FakeCloud,
+        endpoint: str,
+        access_id: str,
+        access_secret: str,
+        auth_type: Any = 0,
+    ) -> None:
+        self._cloud = fake_cloud
+        self.token_info: SimpleNamespace | None = None
+
+    def set_dev_channel(self, channel: str) -> None:
+        pass
+
+    def connect(
+        self,
+        username: str = "",
+        password: str = "",
+        country_code: str = "",
+        schema: str = "",
+    ) -> dict[str, Any]:
+        self._cloud.connects += 1
+        self.token_info = SimpleNamespace(
+            uid="uid", expire_time=(time.time() + 2 * 60 * 60) * 1000
+        )
+        return {"success": True}
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        return self._cloud.get(path)
+
+
+class FakeStore:
+    """Storage on disk shared by all stores of a test."""
+
+    saved: dict[str, Any] | None = None
+
+    def __init__(self, hass: Any, version: int, key: str, private: bool) -> None:
+        pass
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return json.loads(json.dumps(FakeStore.saved)) if FakeStore.saved else None
+
+    def async_delay_save(self, data_func: Any, delay: float) -> None:
+        FakeStore.saved = json.loads(json.dumps(data_func()))
+
+
+class FakeConfigEntries:
+    def __init__(self) -> None:
+        self.entries: dict[str, list[SimpleNamespace]] = {TUYA_DOMAIN: [], DOMAIN: []}
+
+    def async_entries(self, domain: str) -> list[SimpleNamespace]:
+        return self.entries.get(domain, [])
+
+
+class FakeHass:
+    def __init__(self) -> None:
+        self.config_entries = FakeConfigEntries()
+        self.background_tasks: set[asyncio.Task[Any]] = set()
+
+    async def async_add_executor_job(self, target: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+    def async_create_task(self, target: Any) -> asyncio.Task[Any]:
+        return asyncio.get_running_loop().create_task(target)
+
+    def async_create_background_task(self, target: Any, name: str) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(target)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    def add_ble_entry(self, login: dict[str, Any]) -> None:
+        self.config_entries.entries[DOMAIN].append(
+            SimpleNamespace(data={}, options=dict(login))
+        )
+
+
+@pytest.fixture
+def fake_cloud(monkeypatch: pytest.MonkeyPatch) -> FakeCloud:
+    fake_cloud = FakeCloud(45)
+    monkeypatch.setattr(
+        cloud,
+        "TuyaOpenAPI",
+        lambda *args, **kwargs: FakeTuyaOpenAPI(fake_cloud, *args, **kwargs),
+    )
+    monkeypatch.setattr(cloud, "Store", FakeStore)
+    monkeypatch.setattr(FakeStore, "saved", None)
+    _restart(monkeypatch)
+    return fake_cloud
+
+
+def _restart(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Forget everything but the storage on disk like a restart does."""
+    monkeypatch.setattr(cloud, "_cache", {})
+    monkeypatch.setattr(cloud, "_cache_store", None)
+    monkeypatch.setattr(cloud, "_cache_load_lock", asyncio.Lock())
+    monkeypatch.setattr(cloud, "_revalidating", set())
+    monkeypatch.setattr(cloud, "_updating", {})
+    monkeypatch.setattr(cloud, "_credentials_index", {})
+    monkeypatch.setattr(cloud, "cloud_calls_saved", 0)
+
+
+@pytest.fixture
+def hass() -> FakeHass:
+    hass = FakeHass()
+    hass.add_ble_entry(LOGIN)
+    return hass
+
+
+def _cache_item() -> cloud.TuyaCloudCacheItem:
+    return cloud._cache[cloud.HASSTuyaBLEDeviceManager._get_cache_key(LOGIN)]
+
+
+def test_failed_factory_info_batch_keeps_devices(
+    fake_cloud: FakeCloud, hass: FakeHass
+) -> None:
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN))
+
+    async def run() -> None:
+        await manager.build_cache()
+        assert len(_cache_item().credentials) == 45
+        updated = _cache_item().updated
+
+        # Second batch is rate limited on refresh.
+        fake_cloud.failing.add(fake_cloud.devices[TUYA_FACTORY_INFO_BATCH_SIZE]["id"])
+        await manager._update_cache_item(dict(LOGIN))
+        item = _cache_item()
+        assert len(item.credentials) == 45
+        assert _address(TUYA_FACTORY_INFO_BATCH_SIZE) in item.credentials
+        assert cloud._find_credentials(_address(TUYA_FACTORY_INFO_BATCH_SIZE))
+        # Refresh is retried when the cache is used next time.
+        assert item.updated == updated
+
+    asyncio.run(run())
+    assert len(next(iter(FakeStore.saved["items"].values()))["credentials"]) == 45
+
+
+def test_failed_factory_info_batch_on_first_fill(
+    fake_cloud: FakeCloud, hass: FakeHass
+) -> None:
+    fake_cloud.failing.add(fake_cloud.devices[0]["id"])
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN))
+
+    asyncio.run(manager.build_cache())
+    item = _cache_item()
+    assert len(item.credentials) == 45 - TUYA_FACTORY_INFO_BATCH_SIZE
+    assert item.credentials[_address(44)][CONF_DEVICE_ID] == "bf0044"
+    assert item.expired
+
+
+def test_cache_loaded_after_restart(
+    fake_cloud: FakeCloud, hass: FakeHass, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    asyncio.run(cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN)).build_cache())
+    assert fake_cloud.connects == 1
+    # Logins and secrets stay in config entries only.
+    saved = json.dumps(FakeStore.saved)
+    for key in (CONF_USERNAME, CONF_PASSWORD, CONF_ACCESS_ID, CONF_ACCESS_SECRET):
+        assert LOGIN[key] not in saved
+
+    _restart(monkeypatch)
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, {})
+    credentials = asyncio.run(manager.get_device_credentials(_address(7)))
+    assert credentials is not None
+    assert credentials.device_id == "bf0007"
+    assert credentials.local_key == "key0007"
+    assert _cache_item().login == LOGIN
+    assert fake_cloud.connects == 1
+
+
+def test_cache_of_removed_entry_is_pruned(
+    fake_cloud: FakeCloud, hass: FakeHass, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    other_login = {**LOGIN, CONF_USERNAME: "other@example.com"}
+    hass.add_ble_entry(other_login)
+    asyncio.run(cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN)).build_cache())
+    assert len(FakeStore.saved["items"]) == 2
+
+    # The entry of the other account is removed.
+    del hass.config_entries.entries[DOMAIN][1]
+    _restart(monkeypatch)
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, {})
+    asyncio.run(manager.get_device_credentials(_address(0)))
+    assert list(cloud._cache.keys()) == [manager._get_cache_key(LOGIN)]
+    manager._save_cache()
+    assert list(FakeStore.saved["items"].keys()) == [
+        manager._get_stored_key(manager._get_cache_key(LOGIN))
+    ]
+
+
+def test_expired_cache_is_revalidated_in_background(
+    fake_cloud: FakeCloud, hass: FakeHass
+) -> None:
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN))
+
+    async def run() -> None:
+        await manager.build_cache()
+        item = _cache_item()
+        item.updated = time.time() - CLOUD_CACHE_TTL - 1
+        fake_cloud.devices[3]["local_key"] = "newkey0003"
+
+        # Expired credentials are returned at once.
+        credentials = await manager.get_device_credentials(_address(3))
+        assert credentials.local_key == "key0003"
+        assert len(hass.background_tasks) == 1
+        # Other callers join the refresh already scheduled.
+        await manager.get_device_credentials(_address(4))
+        assert len(hass.background_tasks) == 1
+
+        await asyncio.gather(*hass.background_tasks)
+        assert not item.expired
+        credentials = await manager.get_device_credentials(_address(3))
+        assert credentials.local_key == "newkey0003"
+
+    asyncio.run(run())
+    assert fake_cloud.connects == 1
+
+
+def test_factory_infos_are_batched(fake_cloud: FakeCloud, hass: FakeHass) -> None:
+    fake_cloud.set_device_count(201)
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN))
+
+    asyncio.run(manager.build_cache())
+    requests = fake_cloud.factory_info_requests
+    assert len(requests) == 11
+    assert all(len(request) <= TUYA_FACTORY_INFO_BATCH_SIZE for request in requests)
+    assert sorted(sum(requests, [])) == sorted(fake_cloud.macs.keys())
+    assert 1 < fake_cloud.max_in_flight <= TUYA_API_CONCURRENCY
+
+    # Results are matched to devices by id, not by position.
+    item = _cache_item()
+    assert len(item.credentials) == 201
+    for index, device in enumerate(fake_cloud.devices):
+        credentials = item.credentials[_address(index)]
+        assert credentials[CONF_DEVICE_ID] == device["id"]
+        assert credentials[CONF_LOCAL_KEY] == device["local_key"]
+
+
+def test_concurrent_callers_share_one_login(
+    fake_cloud: FakeCloud, hass: FakeHass
+) -> None:
+    callers = 8
+
+    async def run() -> None:
+        await asyncio.gather(
+            *(
+                cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN)).build_cache()
+                for _ in range(callers)
+            )
+        )
+
+    asyncio.run(run())
+    assert fake_cloud.connects == 1
+    assert len(fake_cloud.factory_info_requests) == 3
+    assert cloud.cloud_calls_saved == callers - 1
+    assert len(_cache_item().credentials) == 45
+    assert not cloud._updating
+
+
+def test_device_of_two_accounts_resolves_to_one(
+    fake_cloud: FakeCloud, hass: FakeHass, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    other_login = {**LOGIN, CONF_USERNAME: "other@example.com"}
+    hass.add_ble_entry(other_login)
+
+    async def resolve(logins: list[dict[str, Any]]) -> str:
+        manager = cloud.HASSTuyaBLEDeviceManager(hass, {})
+        await manager._load_cache()
+        for login in logins:
+            await manager._update_cache_item(dict(login))
+        await manager.get_device_credentials(_address(5), save_data=True)
+        return manager.data[CONF_USERNAME]
+
+    usernames = set()
+    for logins in ([LOGIN, other_login], [other_login, LOGIN]):
+        _restart(monkeypatch)
+        monkeypatch.setattr(FakeStore, "saved", None)
+        usernames.add(asyncio.run(resolve(logins)))
+        assert set(cloud._credentials_index[_address(5)].keys()) == {
+            cloud.HASSTuyaBLEDeviceManager._get_cache_key(LOGIN),
+            cloud.HASSTuyaBLEDeviceManager._get_cache_key(other_login),
+        }
+    assert len(usernames) == 1
+
+
+def test_fresh_token_skips_login(fake_cloud: FakeCloud, hass: FakeHass) -> None:
+    manager = cloud.HASSTuyaBLEDeviceManager(hass, dict(LOGIN))
+
+    async def run() -> None:
+        await manager.build_cache()
+        api = _cache_item().api
+        assert fake_cloud.connects == 1
+
+        await manager._update_cache_item(dict(LOGIN))
+        assert fake_cloud.connects == 1
+        assert len(fake_cloud.factory_info_requests) == 6
+
+        # Token about to expire is renewed on the same API session.
+        api.token_info.expire_time = (
+            time.time() + TUYA_TOKEN_REFRESH_MARGIN / 2
+        ) * 1000
+        await manager._update_cache_item(dict(LOGIN))
+        assert fake_cloud.connects == 2
+        assert _cache_item().api is api
+
+    asyncio.run(run())
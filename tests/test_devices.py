@@ -0,0 +1,51 @@
+"""Tests for the product database of the Tuya BLE integration."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.const import Platform  # noqa: E402
+
+from custom_components.tuya_ble.const import (  # noqa: E402
+    FINGERBOT_IDLE_DISCONNECT_DELAY,
+)
+from custom_components.tuya_ble.devices import (  # noqa: E402
+    get_device_idle_disconnect_delay,
+    get_device_platforms,
+)
+
+
+@pytest.mark.parametrize(
+    ("category", "product_id", "delay"),
+    [
+        # Fingerbot without touch button.
+        ("szjqr", "3yqdo5yt", FINGERBOT_IDLE_DISCONNECT_DELAY),
+        # Fingerbot Plus pushes touch button presses.
+        ("szjqr", "blliqpsj", None),
+        # Other categories keep the connection.
+        ("co2bj", "59s19z5m", None),
+        ("unknown", "unknown", None),
+    ],
+)
+def test_idle_disconnect_delay(
+    category: str, product_id: str, delay: float | None
+) -> None:
+    device = SimpleNamespace(category=category, product_id=product_id)
+    assert get_device_idle_disconnect_delay(device) == delay
+
+
+def test_device_platforms() -> None:
+    fingerbot = SimpleNamespace(category="szjqr", product_id="3yqdo5yt")
+    assert get_device_platforms(fingerbot) == [
+        Platform.BUTTON,
+        Platform.NUMBER,
+        Platform.SENSOR,
+        Platform.SELECT,
+        Platform.SWITCH,
+    ]
+    # Signal strength sensor is added for unknown devices too.
+    unknown = SimpleNamespace(category="unknown", product_id="unknown")
+    assert get_device_platforms(unknown) == [Platform.SENSOR]
@@ -0,0 +1,59 @@
+"""Tests for diagnostics of the Tuya BLE integration."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.components.diagnostics import REDACTED  # noqa: E402
+from homeassistant.const import CONF_ADDRESS, CONF_PASSWORD  # noqa: E402
+
+from custom_components.tuya_ble.const import (  # noqa: E402
+    CONF_ACCESS_SECRET,
+    CONF_LOCAL_KEY,
+    DOMAIN,
+)
+from custom_components.tuya_ble.diagnostics import (  # noqa: E402
+    async_get_config_entry_diagnostics,
+)
+
+
+def test_config_entry_diagnostics() -> None:
+    device = SimpleNamespace(
+        address="DC:23:4D:01:02:03",
+        rssi=-60,
+        category="szjqr",
+        product_id="3yqdo5yt",
+        protocol_version="3.3",
+        idle_disconnect_delay=60,
+    )
+    entry = SimpleNamespace(
+        entry_id="entry",
+        data={CONF_ADDRESS: device.address},
+        options={
+            CONF_PASSWORD: "password",
+            CONF_ACCESS_SECRET: "access-secret",
+            CONF_LOCAL_KEY: "0123456789abcdef",
+        },
+    )
+    hass = SimpleNamespace(data={DOMAIN: {"entry": SimpleNamespace(device=device)}})
+
+    diagnostics = asyncio.run(async_get_config_entry_diagnostics(hass, entry))
+
+    assert diagnostics["entry"]["options"] == {
+        CONF_PASSWORD: REDACTED,
+        CONF_ACCESS_SECRET: REDACTED,
+        CONF_LOCAL_KEY: REDACTED,
+    }
+    assert diagnostics["device"][CONF_ADDRESS] == device.address
+    assert set(diagnostics["advertisement_cache"]) == {
+        "hits",
+        "misses",
+        "maxsize",
+        "currsize",
+    }
+    assert "wait_count" in diagnostics["connect_scheduler"]
+    assert "cloud_calls_saved" in diagnostics
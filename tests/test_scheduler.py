@@ -0,0 +1,186 @@
+"""Tests for the connection scheduler and the reconnect policy."""
+from __future__ import annotations
+
+import asyncio
+import random
+
+import pytest
+
+from tuya_ble import scheduler
+from tuya_ble.const import RECONNECT_MAX_DELAY, TuyaBLEConnectPriority
+from tuya_ble.scheduler import TuyaBLEConnectScheduler, TuyaBLEReconnectPolicy
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock)
+    random.seed(0)
+    return clock
+
+
+def simulate(
+    clock: FakeClock,
+    policies: list[TuyaBLEReconnectPolicy],
+    duration: int,
+    start: int = 0,
+) -> list[list[float]]:
+    """Devices advertising every second while every connect fails."""
+    attempts: list[list[float]] = [[] for _ in policies]
+    next_attempt = [float(start)] * len(policies)
+    for tick in range(start, start + duration):
+        clock.now = 1000.0 + tick
+        for index, policy in enumerate(policies):
+            was_open = policy.is_open
+            policy.reset()
+            half_opened = was_open and not policy.is_open
+            if half_opened or (not policy.is_open and tick >= next_attempt[index]):
+                attempts[index].append(tick)
+                policy.record_failure()
+                next_attempt[index] = tick + policy.next_delay()
+    return attempts
+
+
+def test_advertisements_do_not_defeat_backoff(clock: FakeClock) -> None:
+    policy = TuyaBLEReconnectPolicy()
+    (attempts,) = simulate(clock, [policy], 40)
+    # Threshold attempts with backoff, then at most one early half-open.
+    assert len(attempts) <= 6
+
+    (attempts,) = simulate(clock, [policy], 3600, 40)
+    assert len(attempts) < 25
+    # Once backoff reaches its cap, attempts stay at least half of it apart.
+    late_attempts = [attempt for attempt in attempts if attempt >= 600]
+    for previous, current in zip(late_attempts, late_attempts[1:]):
+        assert current - previous >= RECONNECT_MAX_DELAY / 2
+
+
+def test_half_open_once_per_open_period(clock: FakeClock) -> None:
+    policy = TuyaBLEReconnectPolicy(failure_threshold=1)
+    policy.record_failure()
+    assert policy.is_open
+
+    policy.reset()
+    assert policy.is_open
+
+    clock.now += policy._half_open_after + 0.5
+    policy.reset()
+    assert not policy.is_open
+
+    policy.record_failure()
+    assert policy.is_open
+    clock.now += policy._half_open_after + 0.5
+    policy.reset()
+    assert not policy.is_open
+    # The second half-open came after a longer backoff step.
+    assert policy.failures == 2
+
+
+def test_simultaneous_outage_is_spread(clock: FakeClock) -> None:
+    policies = [TuyaBLEReconnectPolicy() for _ in range(50)]
+    attempts = simulate(clock, policies, 600)
+
+    for device_attempts in attempts:
+        assert len(device_attempts) <= 12
+
+    # Every device half-opens its breaker once, but not in the same second.
+    half_open_times = [device_attempts[5] for device_attempts in attempts]
+    assert max(half_open_times) - min(half_open_times) >= 5
+    per_second = max(half_open_times.count(t) for t in set(half_open_times))
+    assert per_second <= 10
+
+
+def test_record_success_closes_breaker(clock: FakeClock) -> None:
+    policy = TuyaBLEReconnectPolicy(failure_threshold=2)
+    policy.record_failure()
+    policy.record_failure()
+    assert policy.is_open
+    policy.record_success()
+    assert not policy.is_open
+    assert policy.next_delay() == 0.0
+
+
+def test_wait_jitter_scales_with_backoff(
+    clock: FakeClock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    policy = TuyaBLEReconnectPolicy(failure_threshold=100)
+    for _ in range(6):
+        policy.record_failure()
+
+    jitter_limits: list[float] = []
+
+    def fake_uniform(low: float, high: float) -> float:
+        jitter_limits.append(high)
+        return 0.0
+
+    monkeypatch.setattr(scheduler.random, "uniform", fake_uniform)
+
+    async def run() -> None:
+        task = asyncio.create_task(policy.wait())
+        await asyncio.sleep(0)
+        policy._opened_at = clock.now
+        policy._half_open_after = 0.0
+        policy.reset()
+        await task
+
+    asyncio.run(run())
+    # Step of the sixth failure is 32 seconds, jitter spans half of it.
+    assert jitter_limits[-1] == 16.0
+
+
+def test_scheduler_priority_order() -> None:
+    connect_scheduler = TuyaBLEConnectScheduler(slots_per_adapter=1)
+    order: list[str] = []
+
+    async def connect(name: str, priority: TuyaBLEConnectPriority) -> None:
+        async with connect_scheduler.slot("hci0", priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def run() -> None:
+        async with connect_scheduler.slot("hci0"):
+            tasks = [
+                asyncio.create_task(
+                    connect("background", TuyaBLEConnectPriority.BACKGROUND)
+                ),
+                asyncio.create_task(connect("user", TuyaBLEConnectPriority.USER)),
+            ]
+            await asyncio.sleep(0)
+            assert connect_scheduler.queued("hci0") == 2
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["user", "background"]
+    assert connect_scheduler.wait_count == 3
+
+
+
+def test_scheduler_as_dict() -> None:
+    connect_scheduler = TuyaBLEConnectScheduler(slots_per_adapter=1)
+
+    async def connect() -> None:
+        async with connect_scheduler.slot("hci0"):
+            pass
+
+    async def run() -> dict:
+        async with connect_scheduler.slot("hci0"):
+            task = asyncio.create_task(connect())
+            await asyncio.sleep(0)
+            stats = connect_scheduler.as_dict()
+        await task
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["slots_per_adapter"] == 1
+    assert stats["active"] == {"hci0": 1}
+    assert stats["queued"] == {"hci0": 1}
+    assert stats["wait_count"] == 1
+    assert connect_scheduler.as_dict()["wait_count"] == 2
@@ -0,0 +1,535 @@
+"""Tests for framing and datapoint encoding of the Tuya BLE protocol."""
+from __future__ import annotations
+
+import asyncio
+import gc
+import importlib
+from struct import pack, unpack
+from typing import Any
+
+from bleak_retry_connector import BleakError, BleakNotFoundError
+from Crypto.Cipher import AES
+import pytest
+
+from tuya_ble import TuyaBLEDevice
+from tuya_ble.const import INPUT_FRAME_MAX_LENGTH, TuyaBLECode, TuyaBLEDataPointType
+from tuya_ble.exceptions import TuyaBLEDataLengthError, TuyaBLEDeviceError
+
+tuya_ble_module = importlib.import_module("tuya_ble.tuya_ble")
+
+
+def _fragments(frame: bytes, size: int) -> list[bytes]:
+    """Split frame the way devices send it in notifications."""
+    fragments: list[bytes] = []
+    pos = 0
+    packet_num = 0
+    while pos < len(frame):
+        header = TuyaBLEDevice._pack_int(packet_num)
+        if packet_num == 0:
+            header += TuyaBLEDevice._pack_int(len(frame)) + bytes([0x40])
+        chunk = frame[pos : pos + size - len(header)]
+        fragments.append(bytes(header + chunk))
+        pos += len(chunk)
+        packet_num += 1
+    return fragments
+
+
+def test_notifications_reassemble_frame(
+    device: TuyaBLEDevice, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    frames: list[bytes] = []
+    monkeypatch.setattr(
+        device, "_parse_input", lambda: frames.append(bytes(device._input_buffer))
+    )
+    frame = bytes(range(256)) * 2
+    for fragment in _fragments(frame, 20):
+        device._notification_handler(0, bytearray(fragment))
+
+    assert frames == [frame]
+
+
+def test_notifications_reject_oversized_frame(
+    device: TuyaBLEDevice, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(device, "_parse_input", pytest.fail)
+    fragment = (
+        TuyaBLEDevice._pack_int(0)
+        + TuyaBLEDevice._pack_int(INPUT_FRAME_MAX_LENGTH + 1)
+        + bytes([0x40, 0x05])
+    )
+    device._notification_handler(0, fragment)
+
+    assert device._input_buffer is None
+    assert device._input_expected_length == 0
+
+
+def test_notifications_reject_overlong_fragment(
+    device: TuyaBLEDevice, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(device, "_parse_input", pytest.fail)
+    fragment = (
+        TuyaBLEDevice._pack_int(0) + TuyaBLEDevice._pack_int(2) + bytes([0x40])
+    )
+    device._notification_handler(0, fragment + bytes(4))
+
+    assert device._input_buffer is None
+
+
+# Datapoints 1: bool True, 2: value 300, 3: enum 2, 4: string "ab",
+# 5: raw 010203. Each is id, type, value length and value.
+DATAPOINTS_V3 = bytes.fromhex(
+    "01010101"
+    "0202040000012c"
+    "03040102"
+    "0403026162"
+    "050003010203"
+)
+# Same datapoints as in protocol 4, value length takes two bytes.
+DATAPOINTS_V4 = bytes.fromhex(
+    "0101000101"
+    "020200040000012c"
+    "0304000102"
+    "040300026162"
+    "05000003010203"
+)
+DATAPOINTS_VALUES = [
+    (1, TuyaBLEDataPointType.DT_BOOL, True),
+    (2, TuyaBLEDataPointType.DT_VALUE, 300),
+    (3, TuyaBLEDataPointType.DT_ENUM, 2),
+    (4, TuyaBLEDataPointType.DT_STRING, "ab"),
+    (5, TuyaBLEDataPointType.DT_RAW, b"\x01\x02\x03"),
+]
+
+# Protocol 4 header: version, 4 byte datapoint sequence number and flags.
+DP_V4_HEADER = bytes.fromhex("00" "00000007" "01")
+DP_V4_ACK = bytes.fromhex("00" "00000007" "01" "00")
+
+SESSION_KEY = bytes.fromhex("00112233445566778899aabbccddeeff")
+# FUN_RECEIVE_DP_V4 #9 with DP_V4_HEADER and datapoints 1: True and
+# 2: -5, encrypted with SESSION_KEY and IV 000102..0f, split for MTU 20.
+ENCRYPTED_DP_V4_FRAME = [
+    bytes.fromhex("00414005000102030405060708090a0b0c0d0e0f"),
+    bytes.fromhex("0192a8234a4b001071ba93e959ffc9b3983ad2ef"),
+    bytes.fromhex("02344842b961a510a31e3457f4827cfc97856416"),
+    bytes.fromhex("03f16c580d367afcdd89a5"),
+]
+
+
+def _crc16_modbus(data: bytes) -> int:
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+class _Recorder:
+    """Records packets the device would send."""
+
+    def __init__(self, device: TuyaBLEDevice) -> None:
+        self.packets: list[tuple[TuyaBLECode, bytes, int]] = []
+        device._send_response = self._send_response
+        device._send_packet = self._send_packet
+
+    async def _send_response(
+        self, code: TuyaBLECode, data: bytes, response_to: int
+    ) -> None:
+        self.packets.append((code, bytes(data), response_to))
+
+    async def _send_packet(
+        self, code: TuyaBLECode, data: bytes, wait_for_response: bool = True
+    ) -> None:
+        self.packets.append((code, bytes(data), 0))
+
+
+def _handle(device: TuyaBLEDevice, code: TuyaBLECode, data: bytes) -> None:
+    async def run() -> None:
+        device._handle_command_or_response(3, 0, code, data)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+
+def _values(device: TuyaBLEDevice) -> list[tuple[int, TuyaBLEDataPointType, Any]]:
+    return [
+        (dp_id, device.datapoints[dp_id].type, device.datapoints[dp_id].value)
+        for dp_id in range(1, 6)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("data", "length_size"), [(DATAPOINTS_V3, 1), (DATAPOINTS_V4, 2)]
+)
+def test_unpack_datapoints(data: bytes, length_size: int) -> None:
+    assert TuyaBLEDevice._unpack_datapoints(data, 0, length_size) == (
+        DATAPOINTS_VALUES
+    )
+
+
+def test_unpack_datapoints_truncated() -> None:
+    with pytest.raises(TuyaBLEDataLengthError):
+        TuyaBLEDevice._unpack_datapoints(DATAPOINTS_V4[:-1], 0, 2)
+
+
+def test_receive_dp_v3(device: TuyaBLEDevice) -> None:
+    recorder = _Recorder(device)
+    _handle(device, TuyaBLECode.FUN_RECEIVE_DP, DATAPOINTS_V3)
+
+    assert _values(device) == DATAPOINTS_VALUES
+    assert recorder.packets == [(TuyaBLECode.FUN_RECEIVE_DP, b"", 3)]
+
+
+def test_receive_dp_v4(device: TuyaBLEDevice) -> None:
+    recorder = _Recorder(device)
+    _handle(device, TuyaBLECode.FUN_RECEIVE_DP_V4, DP_V4_HEADER + DATAPOINTS_V4)
+
+    assert _values(device) == DATAPOINTS_VALUES
+    assert device.datapoints[1].flags == 1
+    assert recorder.packets == [(TuyaBLECode.FUN_RECEIVE_DP_V4, DP_V4_ACK, 3)]
+
+
+def test_receive_time_dp_v4(device: TuyaBLEDevice) -> None:
+    recorder = _Recorder(device)
+    # Timestamp type 1 is a 4 byte count of seconds.
+    timestamp = bytes.fromhex("01" "65000000")
+    _handle(
+        device,
+        TuyaBLECode.FUN_RECEIVE_TIME_DP_V4,
+        DP_V4_HEADER + timestamp + DATAPOINTS_V4,
+    )
+
+    assert _values(device) == DATAPOINTS_VALUES
+    assert device.datapoints[5].timestamp == 0x65000000
+    assert recorder.packets == [
+        (TuyaBLECode.FUN_RECEIVE_TIME_DP_V4, DP_V4_ACK, 3)
+    ]
+
+
+def test_receive_dp_v4_short_header(device: TuyaBLEDevice) -> None:
+    with pytest.raises(TuyaBLEDataLengthError):
+        device._handle_command_or_response(
+            3, 0, TuyaBLECode.FUN_RECEIVE_DP_V4, DP_V4_HEADER[:5]
+        )
+
+
+def _send(device: TuyaBLEDevice, protocol_version: int) -> list[bytes]:
+    device._protocol_version = protocol_version
+    recorder = _Recorder(device)
+    device.datapoints.get_or_create(1, TuyaBLEDataPointType.DT_BOOL, True)
+    device.datapoints.get_or_create(2, TuyaBLEDataPointType.DT_VALUE, -5)
+    device.datapoints.get_or_create(4, TuyaBLEDataPointType.DT_STRING, "ab")
+
+    async def run() -> None:
+        await device._send_datapoints([1, 2, 4])
+        await device._send_datapoints([1])
+
+    asyncio.run(run())
+    return recorder.packets
+
+
+def test_send_datapoints_v3(device: TuyaBLEDevice) -> None:
+    assert _send(device, 3) == [
+        (
+            TuyaBLECode.FUN_SENDER_DPS,
+            bytes.fromhex("01010101" "020204fffffffb" "0403026162"),
+            0,
+        ),
+        (TuyaBLECode.FUN_SENDER_DPS, bytes.fromhex("01010101"), 0),
+    ]
+
+
+def test_send_datapoints_v4(device: TuyaBLEDevice) -> None:
+    assert _send(device, 4) == [
+        (
+            TuyaBLECode.FUN_SENDER_DPS_V4,
+            bytes.fromhex(
+                "00" "00000001" "00"
+                "0101000101" "02020004fffffffb" "040300026162"
+            ),
+            0,
+        ),
+        (
+            TuyaBLECode.FUN_SENDER_DPS_V4,
+            bytes.fromhex("00" "00000002" "00" "0101000101"),
+            0,
+        ),
+    ]
+
+
+def test_send_datapoints_unsupported_protocol(device: TuyaBLEDevice) -> None:
+    with pytest.raises(TuyaBLEDeviceError):
+        _send(device, 2)
+
+
+@pytest.mark.parametrize(
+    ("protocol_version", "code"),
+    [(3, TuyaBLECode.FUN_RECEIVE_DP), (4, TuyaBLECode.FUN_RECEIVE_DP_V4)],
+)
+def test_datapoints_round_trip(
+    device: TuyaBLEDevice, protocol_version: int, code: TuyaBLECode
+) -> None:
+    # Sent frames have the same layout as the received ones.
+    (_, sent, _), _ = _send(device, protocol_version)
+
+    receiver = TuyaBLEDevice(device._device_manager, device._ble_device)
+    _Recorder(receiver)
+    _handle(receiver, code, sent)
+
+    for dp_id in (1, 2, 4):
+        assert receiver.datapoints[dp_id].value == device.datapoints[dp_id].value
+
+
+def test_build_packets_golden(
+    device: TuyaBLEDevice, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        tuya_ble_module.secrets, "token_bytes", lambda size: bytes(range(size))
+    )
+    device._session_key = SESSION_KEY
+    device._protocol_version = 4
+    payload = DP_V4_HEADER + bytes.fromhex("0101000101" "02020004fffffffb")
+
+    packets = device._build_packets(9, TuyaBLECode.FUN_RECEIVE_DP_V4, payload)
+
+    assert packets == ENCRYPTED_DP_V4_FRAME
+
+    # Check the golden frame independently of the device implementation.
+    encrypted = ENCRYPTED_DP_V4_FRAME[0][3:] + b"".join(
+        packet[1:] for packet in ENCRYPTED_DP_V4_FRAME[1:]
+    )
+    assert encrypted[0] == 5
+    raw = AES.new(SESSION_KEY, AES.MODE_CBC, encrypted[1:17]).decrypt(encrypted[17:])
+    assert raw[:12] == pack(
+        ">IIHH", 9, 0, TuyaBLECode.FUN_RECEIVE_DP_V4.value, len(payload)
+    )
+    assert raw[12 : 12 + len(payload)] == payload
+    crc_pos = 12 + len(payload)
+    assert unpack(">H", raw[crc_pos : crc_pos + 2])[0] == _crc16_modbus(
+        raw[:crc_pos]
+    )
+
+
+def test_notifications_decrypt_golden_frame(device: TuyaBLEDevice) -> None:
+    device._session_key = SESSION_KEY
+    recorder = _Recorder(device)
+
+    async def run() -> None:
+        for fragment in ENCRYPTED_DP_V4_FRAME:
+            device._notification_handler(0, bytearray(fragment))
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert device.datapoints[1].value is True
+    assert device.datapoints[2].value == -5
+    assert recorder.packets == [(TuyaBLECode.FUN_RECEIVE_DP_V4, DP_V4_ACK, 9)]
+
+
+class _FakeClient:
+    """Connected GATT client recording calls made by the device."""
+
+    def __init__(self) -> None:
+        self.is_connected = True
+        self.calls: list[str] = []
+
+    async def stop_notify(self, characteristic: str) -> None:
+        self.calls.append("stop_notify")
+
+    async def disconnect(self) -> None:
+        self.calls.append("disconnect")
+        self.is_connected = False
+
+
+def test_idle_disconnect(device: TuyaBLEDevice) -> None:
+    client = _FakeClient()
+    disconnected: list[bool] = []
+    device.register_disconnected_callback(lambda: disconnected.append(True))
+
+    async def run() -> None:
+        device._client = client
+        device._is_paired = True
+        device.idle_disconnect_delay = 0.01
+        await asyncio.sleep(0.05)
+        # Bleak reports the disconnection afterwards.
+        device._disconnected(client)
+
+    asyncio.run(run())
+
+    assert client.calls == ["stop_notify", "disconnect"]
+    assert device._client is None
+    assert not device._is_paired
+    # Idle disconnection is not reported as device going away.
+    assert disconnected == []
+
+
+def test_idle_disconnect_postponed_by_traffic(device: TuyaBLEDevice) -> None:
+    client = _FakeClient()
+
+    async def run() -> None:
+        device._client = client
+        device.idle_disconnect_delay = 0.05
+        for _ in range(4):
+            await asyncio.sleep(0.02)
+            device._reschedule_idle_disconnect()
+        assert client.calls == []
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    assert client.calls == ["stop_notify", "disconnect"]
+
+
+class _HandshakeClient(_FakeClient):
+    """Client of a device which never answers the handshake."""
+
+    mtu_size = 23
+
+    async def start_notify(self, characteristic: str, callback: Any) -> None:
+        self.calls.append("start_notify")
+
+    async def disconnect(self) -> None:
+        await super().disconnect()
+        # Bleak reports the disconnection while disconnecting.
+        self.disconnected_callback(self)
+
+
+def test_handshake_timeout_disconnects_client(
+    device: TuyaBLEDevice, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clients: list[_HandshakeClient] = []
+    disconnected: list[bool] = []
+    device.register_disconnected_callback(lambda: disconnected.append(True))
+
+    async def establish_connection(
+        client_class: Any,
+        ble_device: Any,
+        name: str,
+        disconnected_callback: Any,
+        **kwargs: Any,
+    ) -> _HandshakeClient:
+        client = _HandshakeClient()
+        client.disconnected_callback = disconnected_callback
+        clients.append(client)
+        return client
+
+    async def send_packet_while_connected(*args: Any) -> bool:
+        # Handshake response timed out.
+        return False
+
+    monkeypatch.setattr(tuya_ble_module, "establish_connection", establish_connection)
+    monkeypatch.setattr(
+        device, "_send_packet_while_connected", send_packet_while_connected
+    )
+    monkeypatch.setattr(device._reconnect_policy, "next_delay", lambda: 0)
+
+    with pytest.raises(BleakNotFoundError):
+        asyncio.run(device._ensure_connected())
+
+    assert len(clients) == 5
+    for client in clients:
+        assert client.calls == ["start_notify", "stop_notify", "disconnect"]
+    assert device._client is None
+    assert disconnected == []
+
+
+class _WritingClient(_FakeClient):
+    """Client with slow GATT writes, optionally failing the first one."""
+
+    def __init__(self, fail: bool = False) -> None:
+        super().__init__()
+        self.fail = fail
+        self.written: list[bytes] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def write_gatt_char(
+        self, characteristic: str, data: bytes, response: bool
+    ) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        first = len(self.written) == 0 and self.in_flight == 1
+        try:
+            if self.fail and first:
+                await asyncio.sleep(0.001)
+                raise OSError("write failed")
+            await asyncio.sleep(0.01 if self.fail else 0.001)
+            self.written.append(bytes(data))
+        finally:
+            self.in_flight -= 1
+
+
+def test_send_packets_pipelined(device: TuyaBLEDevice) -> None:
+    client = _WritingClient()
+    packets = [bytes([index]) * 20 for index in range(10)]
+
+    async def run() -> None:
+        device._client = client
+        await device._int_send_packets_locked(packets)
+
+    asyncio.run(run())
+
+    assert client.written == packets
+    assert client.max_in_flight == device._write_window
+
+
+def test_send_packets_failure_drains_writes(
+    device: TuyaBLEDevice, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = _WritingClient(fail=True)
+    monkeypatch.setattr(device, "_disconnected", lambda client: None)
+    errors: list[dict[str, Any]] = []
+
+    async def run() -> None:
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        device._client = client
+        try:
+            await device._int_send_packets_locked([bytes(20)] * 10)
+        except BleakError:
+            pass
+        else:
+            pytest.fail("BleakError not raised")
+        # No write of the failed command may overlap with the next one.
+        assert client.in_flight == 0
+        gc.collect()
+        await asyncio.sleep(0.02)
+
+    asyncio.run(run())
+
+    assert client.written == []
+    assert errors == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"123456789", bytes(range(256)), bytes(range(255, -1, -1)) * 3],
+)
+def test_calc_crc16(data: bytes) -> None:
+    assert TuyaBLEDevice._calc_crc16(data) == _crc16_modbus(data)
+
+
+def test_calc_crc16_check_value() -> None:
+    # CRC-16/MODBUS check value.
+    assert TuyaBLEDevice._calc_crc16(b"123456789") == 0x4B37
+
+
+@pytest.mark.parametrize("length", [16, 32, 64, 80, 256])
+def test_cipher_matches_aes_cbc(length: int) -> None:
+    key = bytes(range(16))
+    iv = bytes(range(16, 32))
+    data = bytes((i * 7) & 0xFF for i in range(length))
+    cipher = tuya_ble_module.TuyaBLECipher(key)
+
+    encrypted = cipher.encrypt(iv, data)
+    assert encrypted == AES.new(key, AES.MODE_CBC, iv).encrypt(data)
+    assert cipher.decrypt(iv, encrypted) == data
+    assert cipher.decrypt(iv, b"") == b""
+
+
+def test_get_cipher_reuses_key_schedule(device: TuyaBLEDevice) -> None:
+    key = bytes(16)
+    cipher = device._get_cipher(key)
+    assert device._get_cipher(key) is cipher
+    assert device._get_cipher(bytes([1]) * 16) is not cipher